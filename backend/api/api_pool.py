@@ -9,6 +9,7 @@ performance.
 import time
 import logging
 import threading
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
 from urllib.parse import urlparse
 import requests
@@ -18,6 +19,36 @@ from urllib3.util.retry import Retry
 logger = logging.getLogger(__name__)
 
 
+def _split_url(url: str) -> Tuple[str, str]:
+    """
+    Split a URL into its base URL and hostname.
+    
+    Only the scheme and host part is parsed and memoized: paths carry
+    per-aircraft identifiers (hexdb, Planespotters) and would miss the
+    cache on nearly every lookup.
+    
+    Args:
+        url: The URL to split
+        
+    Returns:
+        Tuple of (scheme://netloc, netloc)
+    """
+    authority_start = url.find('://') + 3
+    end = len(url)
+    for separator in '/?#':
+        index = url.find(separator, authority_start)
+        if index != -1 and index < end:
+            end = index
+    return _split_base_url(url[:end])
+
+
+@lru_cache(maxsize=64)
+def _split_base_url(base_url: str) -> Tuple[str, str]:
+    """Parse a scheme://host[:port] prefix into (scheme://netloc, netloc)."""
+    parsed = urlparse(base_url)
+    return f"{parsed.scheme}://{parsed.netloc}", parsed.netloc
+
+
 class APIConnectionPool:
     """
     Manages connection pools for external API calls with automatic retry,
@@ -46,12 +77,16 @@ class APIConnectionPool:
         self.backoff_factor = backoff_factor
         self.timeout = timeout
         
+        # One adapter (and so one urllib3 PoolManager) shared by every session;
+        # sessions only keep per-host headers and cookies apart
+        self._adapter = self._create_adapter()
+        
         # Thread-safe session management
         self._sessions: Dict[str, requests.Session] = {}
         self._lock = threading.Lock()
         
         # Rate limiting tracking
-        self._last_request_times: Dict[str, float] = {}
+        self._next_allowed: Dict[str, float] = {}  # hostname -> monotonic time of next free slot
         self._rate_limits: Dict[str, float] = {}  # hostname -> min seconds between requests
         
         logger.info(f"Initialized API connection pool with {pool_connections} connections, "
@@ -69,18 +104,13 @@ class APIConnectionPool:
             self._rate_limits[hostname] = min_interval
             logger.debug(f"Set rate limit for {hostname}: {min_interval}s")
     
-    def _create_session(self, base_url: str) -> requests.Session:
+    def _create_adapter(self) -> HTTPAdapter:
         """
-        Create a new session with connection pooling and retry logic.
+        Create the HTTP adapter with connection pooling and retry logic.
         
-        Args:
-            base_url: Base URL for the API
-            
         Returns:
-            Configured requests Session
+            Configured HTTPAdapter shared by all sessions
         """
-        session = requests.Session()
-        
         # Configure retry strategy
         retry_strategy = Retry(
             total=self.max_retries,
@@ -90,15 +120,27 @@ class APIConnectionPool:
         )
         
         # Configure connection pooling
-        adapter = HTTPAdapter(
+        return HTTPAdapter(
             pool_connections=self.pool_connections,
             pool_maxsize=self.pool_maxsize,
             max_retries=retry_strategy
         )
+    
+    def _create_session(self, base_url: str) -> requests.Session:
+        """
+        Create a new session using the shared connection pool.
+        
+        Args:
+            base_url: Base URL for the API
+            
+        Returns:
+            Configured requests Session
+        """
+        session = requests.Session()
         
-        # Mount adapter for both HTTP and HTTPS
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        # Mount the shared adapter for both HTTP and HTTPS
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
         
         # Set default headers
         session.headers.update({
@@ -120,9 +162,14 @@ class APIConnectionPool:
         Returns:
             Configured requests Session
         """
-        parsed = urlparse(url)
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
-        
+        base_url, _ = _split_url(url)
+
+        # Fast path: sessions are never replaced once created, so an
+        # existing one can be returned without taking the lock
+        session = self._sessions.get(base_url)
+        if session is not None:
+            return session
+
         with self._lock:
             if base_url not in self._sessions:
                 self._sessions[base_url] = self._create_session(base_url)
@@ -139,19 +186,17 @@ class APIConnectionPool:
         if hostname not in self._rate_limits:
             return
         
+        # Reserve the next slot under the lock, but sleep outside it so a
+        # throttled host doesn't block session lookups for other hosts
         with self._lock:
-            min_interval = self._rate_limits[hostname]
-            last_request = self._last_request_times.get(hostname, 0)
-            
-            current_time = time.time()
-            time_since_last = current_time - last_request
-            
-            if time_since_last < min_interval:
-                sleep_time = min_interval - time_since_last
-                logger.debug(f"Rate limiting {hostname}: sleeping for {sleep_time:.2f}s")
-                time.sleep(sleep_time)
-            
-            self._last_request_times[hostname] = time.time()
+            now = time.monotonic()
+            next_allowed = self._next_allowed.get(hostname, 0.0)
+            self._next_allowed[hostname] = max(now, next_allowed) + self._rate_limits[hostname]
+        
+        sleep_time = next_allowed - now
+        if sleep_time > 0:
+            logger.debug(f"Rate limiting {hostname}: sleeping for {sleep_time:.2f}s")
+            time.sleep(sleep_time)
     
     def request(self, method: str, url: str, **kwargs) -> requests.Response:
         """
@@ -170,8 +215,7 @@ class APIConnectionPool:
             kwargs['timeout'] = self.timeout
         
         # Get hostname for rate limiting
-        parsed = urlparse(url)
-        hostname = parsed.netloc
+        _, hostname = _split_url(url)
         
         # Enforce rate limit
         self._enforce_rate_limit(hostname)
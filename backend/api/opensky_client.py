@@ -21,8 +21,8 @@ except ImportError:
 
 from backend.utils.config import Config
 from backend.utils.geometry import (
-    haversine_distance,
-    bearing_between,
+    equirectangular_distance,
+    bearings_from_origin,
     elevation_angle,
     is_plane_approaching,
 )
@@ -54,7 +54,9 @@ class FlightDataClient:
 
     def __init__(self):
         """Initialize the OpenSky API client."""
-        self.last_request_time = 0
+        # Monotonic clock time of the last poll; a wall-clock step must not
+        # skip or stretch the polling interval
+        self.last_request_time = -math.inf
         # Force HTTP fallback due to OAuth2 requirements
         self.use_http_fallback = True
         self.access_token = None
@@ -231,7 +233,7 @@ class FlightDataClient:
 
     def _enforce_rate_limit(self) -> None:
         """Ensure we respect the API rate limit."""
-        current_time = time.time()
+        current_time = time.monotonic()
         time_since_last = current_time - self.last_request_time
 
         if time_since_last < Config.POLLING_INTERVAL:
@@ -269,7 +271,7 @@ class FlightDataClient:
                 # Use HTTP fallback
                 logger.info("Using HTTP fallback to fetch aircraft data")
                 aircraft_list = self._fetch_via_http(bbox)
-                self.last_request_time = time.time()
+                self.last_request_time = time.monotonic()
                 return aircraft_list
 
             # Debug: Log API call attempt
@@ -277,7 +279,7 @@ class FlightDataClient:
 
             # Fetch states from API
             states = self.api.get_states(bbox=bbox)
-            self.last_request_time = time.time()
+            self.last_request_time = time.monotonic()
 
             # Debug: Log API response
             logger.info(
@@ -394,6 +396,18 @@ class FlightDataClient:
             home_lon = Config.HOME_LON
 
         filtered = []
+        search_radius_km = Config.SEARCH_RADIUS_KM
+
+        # Same box the API query uses; anything outside it can be rejected
+        # with four comparisons before any trigonometry
+        min_lat, max_lat, min_lon, max_lon = self.build_bounding_box(
+            home_lat, home_lon, search_radius_km
+        )
+
+        # Home is fixed for the whole batch, so take its trig once
+        home_lat_rad = math.radians(home_lat)
+        sin_home_lat = math.sin(home_lat_rad)
+        cos_home_lat = math.cos(home_lat_rad)
 
         for aircraft in aircraft_list:
             # Skip if on ground
@@ -408,22 +422,28 @@ class FlightDataClient:
             if aircraft["baro_altitude"] < 500:
                 continue
 
-            # Calculate distance from home
-            distance = haversine_distance(
+            # Skip if clearly outside the search area
+            if not (
+                min_lat <= aircraft["latitude"] <= max_lat
+                and min_lon <= aircraft["longitude"] <= max_lon
+            ):
+                continue
+
+            # Calculate distance from home (short range, so the flat-earth
+            # approximation is accurate enough)
+            distance = equirectangular_distance(
                 home_lat, home_lon, aircraft["latitude"], aircraft["longitude"]
             )
             aircraft["distance_km"] = distance
 
             # Skip if outside search radius
-            if distance > Config.SEARCH_RADIUS_KM:
+            if distance > search_radius_km:
                 continue
 
             # Calculate bearings
-            home_to_plane = bearing_between(
-                home_lat, home_lon, aircraft["latitude"], aircraft["longitude"]
-            )
-            plane_to_home = bearing_between(
-                aircraft["latitude"], aircraft["longitude"], home_lat, home_lon
+            home_to_plane, plane_to_home = bearings_from_origin(
+                sin_home_lat, cos_home_lat, home_lon,
+                aircraft["latitude"], aircraft["longitude"]
             )
 
             aircraft["bearing_from_home"] = home_to_plane
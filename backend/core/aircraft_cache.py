@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 class CacheEntry:
     """Represents a single cache entry with TTL."""
     
+    # One entry is created per cached value, so skip the per-instance __dict__
+    __slots__ = ('data', 'expires_at', 'hits', 'created_at')
+    
     def __init__(self, data: Any, ttl: int):
         self.data = data
         self.expires_at = time.time() + ttl
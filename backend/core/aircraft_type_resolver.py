@@ -7,9 +7,18 @@ using multiple data sources in a prioritized order.
 
 import logging
 import json
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Any, List, Optional
 
-from backend.database.db import get_aircraft_from_cache, save_aircraft_to_cache, AircraftDatabase
+from backend.core.aircraft_cache import LRUCache
+from backend.database.db import (
+    get_aircraft_from_cache,
+    get_aircraft_batch_from_cache,
+    save_aircraft_to_cache,
+    AircraftDatabase
+)
 from backend.utils.aircraft_database import fetch_aircraft_details_from_hexdb
 from backend.core.planespotters_client import get_aircraft_type_string
 
@@ -29,6 +38,73 @@ GENERIC_AIRCRAFT_TYPES = [
     "Regional Jet"
 ]
 
+# Common aircraft type mappings, checked in order against the upper-cased
+# "<manufacturer> <type>" string. More specific patterns must come first:
+# Citation is listed before Cessna so a Cessna Citation is not reported as a
+# small plane.
+_TYPE_PATTERNS = tuple((pattern.upper(), friendly_name) for pattern, friendly_name in (
+    # Boeing
+    ('737', 'Boeing 737'),
+    ('747', 'Boeing 747 Jumbo Jet'),
+    ('757', 'Boeing 757'),
+    ('767', 'Boeing 767'),
+    ('777', 'Boeing 777'),
+    ('787', 'Boeing 787 Dreamliner'),
+    # Airbus
+    ('A319', 'Airbus A319'),
+    ('A320', 'Airbus A320'),
+    ('A321', 'Airbus A321'),
+    ('A330', 'Airbus A330'),
+    ('A340', 'Airbus A340'),
+    ('A350', 'Airbus A350'),
+    ('A380', 'Airbus A380 Super Jumbo'),
+    # Embraer
+    ('E170', 'Embraer E170'),
+    ('E175', 'Embraer E175'),
+    ('E190', 'Embraer E190'),
+    ('E195', 'Embraer E195'),
+    ('ERJ', 'Embraer Regional Jet'),
+    # Bombardier
+    ('CRJ', 'Bombardier CRJ'),
+    ('Q400', 'Bombardier Dash 8'),
+    ('DHC-8', 'Bombardier Dash 8'),
+    # ATR
+    ('ATR 42', 'ATR 42 Propeller'),
+    ('ATR 72', 'ATR 72 Propeller'),
+    # Others
+    ('Citation', 'Cessna Citation Jet'),
+    ('Cessna', 'Cessna Small Plane'),
+    ('Beechcraft', 'Beechcraft Small Plane'),
+    ('Gulfstream', 'Gulfstream Private Jet'),
+    ('Learjet', 'Learjet'),
+))
+
+# Manufacturer fallbacks keyed by lower-case manufacturer: (template when a
+# type name is known, name when it isn't). Exact names hit the dict directly;
+# longer forms such as 'The Boeing Company' fall back to a keyword scan.
+_MANUFACTURER_FALLBACKS = {
+    'boeing': ('Boeing {}', 'Boeing Aircraft'),
+    'airbus': ('Airbus {}', 'Airbus Aircraft'),
+    'cessna': (None, 'Cessna Small Plane'),
+    'piper': (None, 'Piper Small Plane'),
+    'beech': (None, 'Beechcraft Small Plane'),
+    'beechcraft': (None, 'Beechcraft Small Plane'),
+}
+
+
+# Recently resolved types keyed by icao24, so aircraft seen on consecutive
+# polls skip the SQLite lookup and the hexdb/Planespotters fallbacks
+RESOLVED_TYPE_TTL_SECONDS = 300
+_resolved_types = LRUCache(max_size=4096, default_ttl=RESOLVED_TYPE_TTL_SECONDS)
+
+# Upper bound on concurrent hexdb/Planespotters lookups for a batch
+MAX_FALLBACK_WORKERS = 8
+
+
+def clear_resolved_type_cache() -> None:
+    """Forget all recently resolved aircraft types."""
+    _resolved_types.clear()
+
 
 def should_log_as_unidentified(aircraft_type: str) -> bool:
     """Check if an aircraft type is generic and should be logged for improvement."""
@@ -48,74 +124,42 @@ def should_log_as_unidentified(aircraft_type: str) -> bool:
     return False
 
 
+def _manufacturer_fallback(manufacturer_key: str) -> Optional[tuple]:
+    """Return the fallback names for a lower-cased manufacturer, if any."""
+    fallback = _MANUFACTURER_FALLBACKS.get(manufacturer_key)
+    if fallback is None and manufacturer_key:
+        for keyword, names in _MANUFACTURER_FALLBACKS.items():
+            if keyword in manufacturer_key:
+                return names
+    return fallback
+
+
+@lru_cache(maxsize=1024)
 def simplify_aircraft_type(manufacturer: str, type_name: str) -> str:
     """
     Convert technical aircraft type to kid-friendly names.
+    
+    Results are memoized: the same few dozen manufacturer/type pairs come
+    back on every polling cycle and the mapping is a pure function of them.
     """
     # Clean up the input
     manufacturer = (manufacturer or '').strip()
     type_name = (type_name or '').strip()
     
-    # Common aircraft type mappings
-    type_mappings = {
-        # Boeing
-        '737': 'Boeing 737',
-        '747': 'Boeing 747 Jumbo Jet',
-        '757': 'Boeing 757',
-        '767': 'Boeing 767',
-        '777': 'Boeing 777',
-        '787': 'Boeing 787 Dreamliner',
-        # Airbus
-        'A319': 'Airbus A319',
-        'A320': 'Airbus A320',
-        'A321': 'Airbus A321',
-        'A330': 'Airbus A330',
-        'A340': 'Airbus A340',
-        'A350': 'Airbus A350',
-        'A380': 'Airbus A380 Super Jumbo',
-        # Embraer
-        'E170': 'Embraer E170',
-        'E175': 'Embraer E175',
-        'E190': 'Embraer E190',
-        'E195': 'Embraer E195',
-        'ERJ': 'Embraer Regional Jet',
-        # Bombardier
-        'CRJ': 'Bombardier CRJ',
-        'Q400': 'Bombardier Dash 8',
-        'DHC-8': 'Bombardier Dash 8',
-        # ATR
-        'ATR 42': 'ATR 42 Propeller',
-        'ATR 72': 'ATR 72 Propeller',
-        # Others
-        'Cessna': 'Cessna Small Plane',
-        'Beechcraft': 'Beechcraft Small Plane',
-        'Gulfstream': 'Gulfstream Private Jet',
-        'Learjet': 'Learjet',
-        'Citation': 'Cessna Citation Jet',
-    }
-    
     # Check for common patterns in the type name
     full_type = f"{manufacturer} {type_name}".upper()
     
-    for pattern, friendly_name in type_mappings.items():
-        if pattern.upper() in full_type:
+    for pattern, friendly_name in _TYPE_PATTERNS:
+        if pattern in full_type:
             return friendly_name
     
     # Special handling for specific manufacturers
-    if 'BOEING' in manufacturer.upper():
-        if type_name:
-            return f"Boeing {type_name}"
-        return "Boeing Aircraft"
-    elif 'AIRBUS' in manufacturer.upper():
-        if type_name:
-            return f"Airbus {type_name}"
-        return "Airbus Aircraft"
-    elif 'CESSNA' in manufacturer.upper():
-        return "Cessna Small Plane"
-    elif 'PIPER' in manufacturer.upper():
-        return "Piper Small Plane"
-    elif 'BEECH' in manufacturer.upper() or 'BEECHCRAFT' in manufacturer.upper():
-        return "Beechcraft Small Plane"
+    fallback = _manufacturer_fallback(manufacturer.lower())
+    if fallback:
+        with_type, without_type = fallback
+        if with_type and type_name:
+            return with_type.format(type_name)
+        return without_type
     
     # If we have both manufacturer and type, combine them nicely
     if manufacturer and type_name:
@@ -129,6 +173,89 @@ def simplify_aircraft_type(manufacturer: str, type_name: str) -> str:
 
 
 def resolve_aircraft_type(icao24: str, additional_data: Dict[str, Any] = None) -> str:
+    """
+    Resolve aircraft type, reusing results from the last few minutes.
+    
+    Args:
+        icao24: Aircraft ICAO24 hex identifier
+        additional_data: Optional dict with callsign, registration, etc.
+        
+    Returns:
+        Resolved aircraft type string
+    """
+    aircraft_type = _resolved_types.get(icao24)
+    if aircraft_type is None:
+        aircraft_type = _resolve_aircraft_type_uncached(icao24, additional_data)
+        _resolved_types.set(icao24, aircraft_type)
+    return aircraft_type
+
+
+def resolve_aircraft_types(icao24_list: List[str]) -> Dict[str, str]:
+    """
+    Resolve the aircraft types for a batch of aircraft.
+    
+    Same result as calling resolve_aircraft_type() for each aircraft, but
+    everything not resolved recently is looked up in the local cache with
+    a single query; only the remaining misses fall back to hexdb and
+    Planespotters, and those lookups run concurrently.
+    
+    Args:
+        icao24_list: Aircraft ICAO24 hex identifiers
+        
+    Returns:
+        Dictionary mapping each icao24 to its resolved aircraft type
+    """
+    aircraft_types = {}
+    misses = []
+    for icao24 in icao24_list:
+        aircraft_type = _resolved_types.get(icao24)
+        if aircraft_type is None:
+            misses.append(icao24)
+        else:
+            aircraft_types[icao24] = aircraft_type
+    
+    if not misses:
+        return aircraft_types
+    
+    cached_rows = get_aircraft_batch_from_cache(misses)
+    unresolved = []
+    for icao24 in misses:
+        cached_data = cached_rows.get(icao24.lower())
+        aircraft_type = _usable_cached_type(cached_data)
+        if aircraft_type is None:
+            unresolved.append((icao24, cached_data))
+        else:
+            _resolved_types.set(icao24, aircraft_type)
+            aircraft_types[icao24] = aircraft_type
+    
+    icao24s = [icao24 for icao24, _ in unresolved]
+    unresolved_rows = [cached_data for _, cached_data in unresolved]
+    if len(unresolved) > 1:
+        # The fallbacks are network-bound, so overlap their round trips;
+        # per-host rate limits still apply through the shared API pool
+        with ThreadPoolExecutor(max_workers=min(MAX_FALLBACK_WORKERS, len(unresolved))) as executor:
+            fallback_types = list(executor.map(_resolve_from_sources, icao24s, repeat(None), unresolved_rows))
+    else:
+        fallback_types = list(map(_resolve_from_sources, icao24s, repeat(None), unresolved_rows))
+    
+    for icao24, aircraft_type in zip(icao24s, fallback_types):
+        _resolved_types.set(icao24, aircraft_type)
+        aircraft_types[icao24] = aircraft_type
+    
+    return aircraft_types
+
+
+def _usable_cached_type(cached_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Return the cached aircraft type unless it is missing or a placeholder."""
+    if cached_data and cached_data.get('type'):
+        cached_type = cached_data['type']
+        # Skip if it's a placeholder or unknown
+        if 'placeholder' not in cached_type.lower() and cached_type != 'Unknown Aircraft':
+            return cached_type
+    return None
+
+
+def _resolve_aircraft_type_uncached(icao24: str, additional_data: Dict[str, Any] = None) -> str:
     """
     Resolve aircraft type using multiple data sources with fallback.
     
@@ -147,8 +274,29 @@ def resolve_aircraft_type(icao24: str, additional_data: Dict[str, Any] = None) -
     """
     logger.debug(f"Resolving aircraft type for {icao24}")
     
-    # Initialize database connection for logging
-    db = AircraftDatabase()
+    # 1. Check local cache first
+    cached_data = get_aircraft_from_cache(icao24)
+    cached_type = _usable_cached_type(cached_data)
+    if cached_type:
+        logger.debug(f"Found type in cache for {icao24}: {cached_type}")
+        return cached_type
+    
+    return _resolve_from_sources(icao24, additional_data, cached_data)
+
+
+def _resolve_from_sources(icao24: str, additional_data: Optional[Dict[str, Any]],
+                          cached_data: Optional[Dict[str, Any]]) -> str:
+    """
+    Resolve aircraft type from hexdb, then Planespotters, after a cache miss.
+    
+    Args:
+        icao24: Aircraft ICAO24 hex identifier
+        additional_data: Optional dict with callsign, registration, etc.
+        cached_data: The aircraft's existing cache row, if any
+        
+    Returns:
+        Resolved aircraft type string
+    """
     log_data = {
         'icao24': icao24,
         'data_source': 'none',
@@ -165,15 +313,6 @@ def resolve_aircraft_type(icao24: str, additional_data: Dict[str, Any] = None) -
             'operator': additional_data.get('operator', '')
         })
     
-    # 1. Check local cache first
-    cached_data = get_aircraft_from_cache(icao24)
-    if cached_data and cached_data.get('type'):
-        cached_type = cached_data['type']
-        # Skip if it's a placeholder or unknown
-        if 'placeholder' not in cached_type.lower() and cached_type != 'Unknown Aircraft':
-            logger.debug(f"Found type in cache for {icao24}: {cached_type}")
-            return cached_type
-    
     # 2. Try hexdb (local database)
     try:
         aircraft_details = fetch_aircraft_details_from_hexdb(icao24)
@@ -197,7 +336,7 @@ def resolve_aircraft_type(icao24: str, additional_data: Dict[str, Any] = None) -
                 
                 # Log if it's a generic type
                 if should_log_as_unidentified(simplified_type):
-                    db.log_unidentified_aircraft(log_data)
+                    _log_unidentified(log_data)
                 
                 # Cache the result
                 if cached_data:
@@ -239,7 +378,7 @@ def resolve_aircraft_type(icao24: str, additional_data: Dict[str, Any] = None) -
             
             # Log if it's a generic type
             if should_log_as_unidentified(final_type):
-                db.log_unidentified_aircraft(log_data)
+                _log_unidentified(log_data)
             
             # Cache the result
             if cached_data:
@@ -263,11 +402,18 @@ def resolve_aircraft_type(icao24: str, additional_data: Dict[str, Any] = None) -
         'data_source': 'fallback',
         'simplified_type': 'Unknown Aircraft'
     })
-    db.log_unidentified_aircraft(log_data)
+    _log_unidentified(log_data)
     
     return "Unknown Aircraft"
 
 
+def _log_unidentified(log_data: Dict[str, Any]) -> None:
+    """Record an aircraft whose type could only be resolved generically."""
+    # Opened per call: this runs in the fallback worker threads
+    with AircraftDatabase() as db:
+        db.log_unidentified_aircraft(log_data)
+
+
 def get_aircraft_info_with_fallbacks(icao24: str) -> Dict[str, Any]:
     """
     Get comprehensive aircraft information using all available sources.
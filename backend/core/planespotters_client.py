@@ -177,7 +177,7 @@ def get_airline_info(icao24: str) -> Optional[Dict[str, str]]:
 
 def clear_cache():
     """Clear the internal cache."""
-    global _aircraft_details_cache, _cache_timestamps
+    # Clear in place so modules holding a reference to the dicts stay in sync
     _aircraft_details_cache.clear()
     _cache_timestamps.clear()
     logger.info("Cleared Planespotters cache")
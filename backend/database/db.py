@@ -3,25 +3,50 @@ Database module for caching aircraft information.
 Manages SQLite connection and aircraft image cache.
 """
 
+import os
 import sqlite3
 import logging
-from typing import Optional, Dict, Any, List
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Union
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Default database location, looked up at connection time so it can be redirected
+# (e.g. to a shared in-memory "file:...?mode=memory&cache=shared" URI in tests)
+DB_PATH = "backend/aircraft_cache.db"
+
+
+def apply_test_mode_pragmas(connection: sqlite3.Connection) -> bool:
+    """
+    Relax durability on a connection when running under BRUM_TEST_MODE.
+    
+    Args:
+        connection: Newly opened SQLite connection
+        
+    Returns:
+        True if test mode is on and the pragmas were applied
+    """
+    if os.getenv('BRUM_TEST_MODE') != '1':
+        return False
+    # Test databases are throwaway, so skip fsyncs and the on-disk journal
+    connection.execute("PRAGMA synchronous=OFF")
+    connection.execute("PRAGMA journal_mode=MEMORY")
+    connection.execute("PRAGMA temp_store=MEMORY")
+    return True
+
 
 class AircraftDatabase:
     """Manages aircraft data caching using SQLite."""
     
-    def __init__(self, db_path: str = "backend/aircraft_cache.db"):
+    def __init__(self, db_path: Optional[str] = None):
         """
         Initialize database connection.
         
         Args:
-            db_path: Path to SQLite database file
+            db_path: Path or "file:" URI of the SQLite database (defaults to DB_PATH)
         """
-        self.db_path = db_path
+        self.db_path = db_path or DB_PATH
         self.connection = None
         self._ensure_db_directory()
         self._connect()
@@ -31,16 +56,25 @@ class AircraftDatabase:
     
     def _ensure_db_directory(self) -> None:
         """Ensure the database directory exists."""
+        if self._is_uri() or self.db_path == ':memory:':
+            return
         db_dir = Path(self.db_path).parent
         db_dir.mkdir(parents=True, exist_ok=True)
     
+    def _is_uri(self) -> bool:
+        """Check whether the database path is a SQLite URI."""
+        return self.db_path.startswith('file:')
+    
     def _connect(self) -> None:
         """Establish database connection."""
         # Enable WAL mode for better concurrent access
-        self.connection = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        self.connection = sqlite3.connect(
+            self.db_path, timeout=30.0, check_same_thread=False, uri=self._is_uri()
+        )
         self.connection.row_factory = sqlite3.Row
-        # Enable Write-Ahead Logging for better concurrency
-        self.connection.execute("PRAGMA journal_mode=WAL")
+        if not apply_test_mode_pragmas(self.connection):
+            # Enable Write-Ahead Logging for better concurrency
+            self.connection.execute("PRAGMA journal_mode=WAL")
         self.connection.execute("PRAGMA busy_timeout=30000")
     
     def create_tables(self) -> None:
@@ -54,6 +88,11 @@ class AircraftDatabase:
                 last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Lets cleanup_old_cache() range-scan expired rows instead of the whole table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_aircraft_last_updated
+            ON aircraft(last_updated DESC)
+        """)
         self.connection.commit()
 
     def create_logbook_table(self) -> None:
@@ -88,33 +127,45 @@ class AircraftDatabase:
                 pass # Column already exists
         self.connection.commit()
 
-    def add_to_logbook(self, aircraft_type: str, image_url: str) -> None:
+    def add_to_logbook(self, aircraft_type: str, image_url: str,
+                       spotted_at: Optional[str] = None) -> None:
         """
         Add a new aircraft to the logbook or update an existing one.
-        Increments the sighting count and updates the last spotted timestamp.
+        Increments the sighting count and widens the first/last spotted
+        timestamps to include this sighting.
+        
+        Args:
+            spotted_at: Optional 'YYYY-MM-DD HH:MM:SS' timestamp for the sighting.
+                        Defaults to the database's CURRENT_TIMESTAMP.
         """
         cursor = self.connection.cursor()
         # The image_url might be updated if a better one is found later
         # The COALESCE function ensures we don't nullify an existing image url
+        # Sightings may be recorded out of order, so keep the earliest first
+        # and the latest last timestamp rather than the most recent write
         cursor.execute("""
-            INSERT INTO logbook (aircraft_type, image_url, last_spotted, sighting_count)
-            VALUES (?, ?, CURRENT_TIMESTAMP, 1)
+            INSERT INTO logbook (aircraft_type, image_url, first_spotted, last_spotted, sighting_count)
+            VALUES (?1, ?2, COALESCE(?3, CURRENT_TIMESTAMP), COALESCE(?3, CURRENT_TIMESTAMP), 1)
             ON CONFLICT(aircraft_type) DO UPDATE SET
                 sighting_count = sighting_count + 1,
-                last_spotted = CURRENT_TIMESTAMP,
+                first_spotted = MIN(COALESCE(first_spotted, excluded.first_spotted), excluded.first_spotted),
+                last_spotted = MAX(COALESCE(last_spotted, excluded.last_spotted), excluded.last_spotted),
                 image_url = COALESCE(excluded.image_url, image_url)
-        """, (aircraft_type, image_url or ''))
+        """, (aircraft_type, image_url or '', spotted_at))
         self.connection.commit()
 
-    def get_logbook(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_logbook(self, since: Optional[Union[str, datetime]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve entries from the logbook, optionally filtering by date.
         
         Args:
-            since: An ISO 8601 timestamp. If provided, only entries newer
-                   than this timestamp are returned.
+            since: An ISO 8601 timestamp or naive UTC datetime. If provided,
+                   only entries newer than this timestamp are returned.
         """
         cursor = self.connection.cursor()
+        if isinstance(since, datetime):
+            # Match the 'YYYY-MM-DD HH:MM:SS' format SQLite's CURRENT_TIMESTAMP stores
+            since = since.strftime('%Y-%m-%d %H:%M:%S')
         if since:
             cursor.execute(
                 "SELECT * FROM logbook WHERE first_spotted > ? ORDER BY first_spotted DESC",
@@ -223,6 +274,38 @@ class AircraftDatabase:
             }
         return None
     
+    def get_aircraft_batch_from_cache(self, icao24_list: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve cached aircraft data for several aircraft in one query.
+        
+        Args:
+            icao24_list: Aircraft ICAO24 hex identifiers
+            
+        Returns:
+            Dictionary mapping lower-cased icao24 to aircraft data; aircraft
+            not in the cache are omitted
+        """
+        keys = list({icao24.lower() for icao24 in icao24_list})
+        if not keys:
+            return {}
+        
+        placeholders = ','.join('?' * len(keys))
+        cursor = self.connection.cursor()
+        cursor.execute(
+            f"SELECT * FROM aircraft WHERE icao24 IN ({placeholders})",
+            keys
+        )
+        
+        return {
+            row['icao24']: {
+                'icao24': row['icao24'],
+                'image_url': row['image_url'],
+                'type': row['type'],
+                'last_updated': row['last_updated']
+            }
+            for row in cursor.fetchall()
+        }
+    
     def save_aircraft_to_cache(self, record: Dict[str, Any]) -> None:
         """
         Save or update aircraft data in cache.
@@ -248,6 +331,26 @@ class AircraftDatabase:
         self.connection.commit()
         logger.info(f"Cleared cache for aircraft {icao24}")
     
+    def cleanup_old_cache(self, max_age_hours: int = 24) -> int:
+        """
+        Remove cached aircraft entries older than the given age.
+        
+        Args:
+            max_age_hours: Entries last updated before this many hours ago are removed
+            
+        Returns:
+            Number of entries removed
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "DELETE FROM aircraft WHERE last_updated < datetime('now', ?)",
+            (f'-{max_age_hours} hours',)
+        )
+        self.connection.commit()
+        if cursor.rowcount:
+            logger.info(f"Removed {cursor.rowcount} expired aircraft cache entries")
+        return cursor.rowcount
+    
     def close(self) -> None:
         """Close database connection."""
         if self.connection:
@@ -286,6 +389,22 @@ def get_aircraft_from_cache(icao24: str) -> Optional[Dict[str, Any]]:
         return db.get_aircraft_from_cache(icao24)
 
 
+def get_aircraft_batch_from_cache(icao24_list: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieve cached aircraft data for several aircraft at once.
+    
+    Args:
+        icao24_list: Aircraft ICAO24 identifiers
+        
+    Returns:
+        Dictionary mapping lower-cased icao24 to aircraft data
+    """
+    if not icao24_list:
+        return {}
+    with AircraftDatabase() as db:
+        return db.get_aircraft_batch_from_cache(icao24_list)
+
+
 def save_aircraft_to_cache(record: Dict[str, Any]) -> None:
     """
     Save aircraft data to cache.
@@ -296,17 +415,23 @@ def save_aircraft_to_cache(record: Dict[str, Any]) -> None:
     with AircraftDatabase() as db:
         db.save_aircraft_to_cache(record)
 
-def get_logbook(since: Optional[str] = None) -> List[Dict[str, Any]]:
+def get_logbook(since: Optional[Union[str, datetime]] = None) -> List[Dict[str, Any]]:
     """Retrieve all logbook entries."""
     with AircraftDatabase() as db:
         return db.get_logbook(since=since)
 
-def add_to_logbook(aircraft_type: str, image_url: str) -> None:
+def add_to_logbook(aircraft_type: str, image_url: str,
+                   spotted_at: Optional[str] = None) -> None:
     """Add an entry to the logbook."""
     with AircraftDatabase() as db:
-        db.add_to_logbook(aircraft_type, image_url)
+        db.add_to_logbook(aircraft_type, image_url, spotted_at)
 
 def clear_aircraft_cache(icao24: str) -> None:
     """Clear cache for a specific aircraft."""
     with AircraftDatabase() as db:
-        db.clear_aircraft_cache(icao24)
\ No newline at end of file
+        db.clear_aircraft_cache(icao24)
+
+def cleanup_old_cache(max_age_hours: int = 24) -> int:
+    """Remove aircraft cache entries older than max_age_hours."""
+    with AircraftDatabase() as db:
+        return db.cleanup_old_cache(max_age_hours)
@@ -54,9 +54,9 @@ class AircraftDetails:
         return f"{self.manufacturer} {self.type_name}" if self.manufacturer and self.type_name else "Unknown Aircraft"
 
 
-@dataclass
+@dataclass(slots=True)
 class AircraftState:
-    """Current aircraft state model."""
+    """Current aircraft state model (one per aircraft per poll, so slotted)."""
     icao24: str
     callsign: Optional[str]
     latitude: float
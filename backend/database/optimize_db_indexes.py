@@ -2,17 +2,60 @@
 Database index optimization script.
 
 This script analyzes the database schema and creates optimal indexes
-for improving query performance.
+for improving query performance. Run it from the repository root with
+``python -m backend.database.optimize_db_indexes``.
 """
 
 import sqlite3
 import logging
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+from backend.database.db import apply_test_mode_pragmas
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows sampled per index by ANALYZE
+ANALYSIS_LIMIT = 1000
+
+# Optimized indexes per table as (description, CREATE INDEX statement)
+AIRCRAFT_INDEXES = (
+    # Index on last_updated for time-based queries
+    ("aircraft.last_updated", """
+        CREATE INDEX IF NOT EXISTS idx_aircraft_last_updated 
+        ON aircraft(last_updated DESC)
+    """),
+    # Composite index for type and last_updated
+    ("aircraft(type, last_updated)", """
+        CREATE INDEX IF NOT EXISTS idx_aircraft_type_updated 
+        ON aircraft(type, last_updated DESC)
+    """),
+)
+
+LOGBOOK_INDEXES = (
+    # Index on first_spotted for chronological queries
+    ("logbook.first_spotted", """
+        CREATE INDEX IF NOT EXISTS idx_logbook_first_spotted 
+        ON logbook(first_spotted DESC)
+    """),
+    # Index on last_spotted for recent activity queries
+    ("logbook.last_spotted", """
+        CREATE INDEX IF NOT EXISTS idx_logbook_last_spotted 
+        ON logbook(last_spotted DESC)
+    """),
+    # Index on sighting_count for popularity queries
+    ("logbook.sighting_count", """
+        CREATE INDEX IF NOT EXISTS idx_logbook_sighting_count 
+        ON logbook(sighting_count DESC)
+    """),
+    # Composite index for filtered queries by date
+    ("logbook(first_spotted, aircraft_type)", """
+        CREATE INDEX IF NOT EXISTS idx_logbook_spotted_type 
+        ON logbook(first_spotted DESC, aircraft_type)
+    """),
+)
+
 
 class DatabaseOptimizer:
     """Optimizes database indexes for better performance."""
@@ -21,11 +64,52 @@ class DatabaseOptimizer:
         """Initialize the database optimizer."""
         self.db_path = db_path
         self.connection = None
+        self._owns_connection = True
+        # Column info per table; the optimizer never alters table schemas
+        self._table_info: Dict[str, List[dict]] = {}
+    
+    @classmethod
+    def from_connection(cls, connection: sqlite3.Connection,
+                        db_path: str = "backend/aircraft_cache.db") -> "DatabaseOptimizer":
+        """
+        Create an optimizer that works on an already open connection.
+        
+        The caller keeps ownership of the connection: optimize() leaves it
+        open afterwards. Its row_factory is switched to sqlite3.Row, which
+        the analysis methods rely on.
+        
+        Args:
+            connection: Open connection to the database to optimize; it must
+                be in autocommit mode (isolation_level=None) and outside a
+                transaction, since index creation begins its own transaction
+                and VACUUM cannot run inside one
+            db_path: Path of that database, used for the size statistics
+            
+        Returns:
+            DatabaseOptimizer bound to the connection
+            
+        Raises:
+            ValueError: If the connection is not in autocommit mode or has a
+                transaction open
+        """
+        if connection.isolation_level is not None:
+            raise ValueError("DatabaseOptimizer needs an autocommit connection (isolation_level=None)")
+        if connection.in_transaction:
+            raise ValueError("DatabaseOptimizer cannot start inside an open transaction")
+        
+        optimizer = cls(db_path)
+        connection.row_factory = sqlite3.Row
+        optimizer.connection = connection
+        optimizer._owns_connection = False
+        return optimizer
     
     def connect(self) -> None:
         """Connect to the database."""
-        self.connection = sqlite3.connect(self.db_path)
+        # Autocommit mode: index creation manages its own transactions and
+        # VACUUM must run outside of one
+        self.connection = sqlite3.connect(self.db_path, isolation_level=None)
         self.connection.row_factory = sqlite3.Row
+        apply_test_mode_pragmas(self.connection)
         logger.info(f"Connected to database: {self.db_path}")
     
     def close(self) -> None:
@@ -51,66 +135,43 @@ class DatabaseOptimizer:
     
     def get_table_info(self, table_name: str) -> List[dict]:
         """Get information about table columns."""
+        table_info = self._table_info.get(table_name)
+        if table_info is None:
+            cursor = self.connection.cursor()
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            table_info = [dict(row) for row in cursor.fetchall()]
+            self._table_info[table_name] = table_info
+        return table_info
+    
+    def _create_indexes(self, indexes: Tuple[Tuple[str, str], ...]) -> None:
+        """Create the given indexes in a single transaction."""
         cursor = self.connection.cursor()
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            for description, sql in indexes:
+                logger.info(f"Creating index on {description}...")
+                cursor.execute(sql)
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
     
     def create_aircraft_indexes(self) -> None:
         """Create optimized indexes for the aircraft table."""
-        cursor = self.connection.cursor()
-        
-        # Index on last_updated for time-based queries
-        logger.info("Creating index on aircraft.last_updated...")
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aircraft_last_updated 
-            ON aircraft(last_updated DESC)
-        """)
-        
-        # Composite index for type and last_updated
-        logger.info("Creating composite index on aircraft(type, last_updated)...")
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aircraft_type_updated 
-            ON aircraft(type, last_updated DESC)
-        """)
-        
-        self.connection.commit()
+        self._create_indexes(AIRCRAFT_INDEXES)
         logger.info("Aircraft table indexes created")
     
     def create_logbook_indexes(self) -> None:
         """Create optimized indexes for the logbook table."""
-        cursor = self.connection.cursor()
-        
-        # Index on first_spotted for chronological queries
-        logger.info("Creating index on logbook.first_spotted...")
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_logbook_first_spotted 
-            ON logbook(first_spotted DESC)
-        """)
-        
-        # Index on last_spotted for recent activity queries
-        logger.info("Creating index on logbook.last_spotted...")
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_logbook_last_spotted 
-            ON logbook(last_spotted DESC)
-        """)
-        
-        # Index on sighting_count for popularity queries
-        logger.info("Creating index on logbook.sighting_count...")
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_logbook_sighting_count 
-            ON logbook(sighting_count DESC)
-        """)
-        
-        # Composite index for filtered queries by date
-        logger.info("Creating composite index on logbook(first_spotted, aircraft_type)...")
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_logbook_spotted_type 
-            ON logbook(first_spotted DESC, aircraft_type)
-        """)
-        
-        self.connection.commit()
+        self._create_indexes(LOGBOOK_INDEXES)
         logger.info("Logbook table indexes created")
     
+    def create_all_indexes(self) -> None:
+        """Create the optimized indexes for every table in one transaction."""
+        indexes = AIRCRAFT_INDEXES + LOGBOOK_INDEXES
+        self._create_indexes(indexes)
+        logger.info(f"Created {len(indexes)} indexes")
+    
     def analyze_query_plans(self) -> None:
         """Analyze query execution plans for common queries."""
         cursor = self.connection.cursor()
@@ -162,6 +223,9 @@ class DatabaseOptimizer:
     def analyze_tables(self) -> None:
         """Update SQLite's internal statistics for query optimization."""
         logger.info("Analyzing tables...")
+        # Sample at most ANALYSIS_LIMIT rows per index so large tables don't
+        # pay for a full scan; the estimates are plenty for index selection
+        self.connection.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
         self.connection.execute("ANALYZE")
         logger.info("Table analysis completed")
     
@@ -191,10 +255,17 @@ class DatabaseOptimizer:
         
         return stats
     
-    def optimize(self) -> None:
-        """Run the complete optimization process."""
+    def optimize(self, skip_vacuum: bool = False) -> None:
+        """
+        Run the complete optimization process.
+        
+        Args:
+            skip_vacuum: Skip the final VACUUM, which rewrites the whole
+                database file and is only worth running periodically
+        """
         try:
-            self.connect()
+            if self._owns_connection:
+                self.connect()
             
             # Show current state
             logger.info("Current database state:")
@@ -210,8 +281,7 @@ class DatabaseOptimizer:
             
             # Create new indexes
             logger.info("\nCreating optimized indexes...")
-            self.create_aircraft_indexes()
-            self.create_logbook_indexes()
+            self.create_all_indexes()
             
             # Analyze tables
             self.analyze_tables()
@@ -220,7 +290,8 @@ class DatabaseOptimizer:
             self.analyze_query_plans()
             
             # Vacuum database
-            self.vacuum_database()
+            if not skip_vacuum:
+                self.vacuum_database()
             
             # Show final state
             logger.info("\nFinal database state:")
@@ -231,7 +302,8 @@ class DatabaseOptimizer:
             logger.info("\nDatabase optimization completed successfully!")
             
         finally:
-            self.close()
+            if self._owns_connection:
+                self.close()
 
 
 def main():
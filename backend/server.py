@@ -5,9 +5,11 @@ WebSocket server for real-time aircraft data streaming.
 import asyncio
 import json
 import logging
+import logging.handlers
+import queue
 import time
-from datetime import datetime
-from typing import Set, Dict, Any, Optional, List
+from datetime import datetime, timezone
+from typing import Set, Dict, Any, Optional, List, Union
 import websockets
 from websockets.server import WebSocketServerProtocol
 
@@ -17,25 +19,31 @@ from backend.api.opensky_client import (
     filter_aircraft,
     is_visible
 )
-from backend.database.db import add_to_logbook, get_logbook, AircraftDatabase
+from backend.database.db import add_to_logbook, get_logbook, cleanup_old_cache, AircraftDatabase
 from backend.utils.aircraft_data import get_aircraft_data
 from backend.utils.aircraft_database import (
     fetch_flight_route_from_hexdb,
     fetch_airport_info_from_hexdb
 )
-from backend.core.aircraft_type_resolver import resolve_aircraft_type
+from backend.core.aircraft_type_resolver import resolve_aircraft_type, resolve_aircraft_types
 from backend.utils.auth import require_auth
 from backend.utils.config import Config
+from backend.utils.geometry import calculate_eta
 
 
-# Configure logging
+# Configure logging. While the server runs, main() moves the file and console
+# writes onto a background listener thread so they never block the event loop.
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler(Config.LOG_FILE),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
 logging.basicConfig(
     level=getattr(logging, Config.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(Config.LOG_FILE),
-        logging.StreamHandler()
-    ]
+    handlers=_log_handlers
 )
 
 # Also set debug level for our modules during debugging
@@ -43,6 +51,48 @@ logging.getLogger('backend.api.opensky_client').setLevel(logging.DEBUG)
 logging.getLogger('backend.utils.geometry').setLevel(logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps_message(message: Dict[str, Any]) -> str:
+    """Serialize an outgoing message, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        # Decode so clients keep receiving text frames rather than binary ones
+        return orjson.dumps(message, option=orjson.OPT_NAIVE_UTC).decode()
+    return json.dumps(message)
+
+
+def loads_message(message: Union[str, bytes]) -> Any:
+    """Parse an incoming message, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(message)
+    return json.loads(message)
+
+
+def parse_since(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a client-supplied ISO 8601 'since' timestamp.
+    
+    Returns a naive UTC datetime, or None if the value is empty or invalid.
+    """
+    if not value:
+        return None
+    try:
+        # fromisoformat accepts the browser's toISOString() format ('...Z') on 3.11+
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid 'since' timestamp: {value!r}")
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 
 # Moved to aircraft_type_resolver.py
 
@@ -65,6 +115,20 @@ class AircraftTracker:
         # Cleanup old entries every hour
         self.MAX_TRACKING_AGE_HOURS = 24  # Keep aircraft data for 24 hours
         self.CLEANUP_INTERVAL_SECONDS = 3600  # Run cleanup every hour
+        # Configuration is fixed at startup, so serialize the get_config reply once
+        self.config_message = dumps_message({
+            'type': 'config',
+            'config': {
+                'home': {
+                    'lat': Config.HOME_LAT,
+                    'lon': Config.HOME_LON
+                },
+                'search': {
+                    'radiusKm': Config.SEARCH_RADIUS_KM,
+                    'minElevationAngle': Config.MIN_ELEVATION_ANGLE
+                }
+            }
+        })
     
     def format_aircraft_message(self, aircraft: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -137,9 +201,7 @@ class AircraftTracker:
                 Returns:
                     Formatted message with aircraft list and ETAs
                 """
-                from backend.utils.geometry import calculate_eta
-                
-                formatted_aircraft = []
+                approaching = []
                 
                 for aircraft in aircraft_list:
                     # Skip if no velocity data
@@ -157,9 +219,15 @@ class AircraftTracker:
                     if eta_seconds == float('inf'):
                         continue
 
-                    # Get Aircraft Type using resolver
-                    icao24 = aircraft['icao24']
-                    aircraft_type = resolve_aircraft_type(icao24)
+                    approaching.append((aircraft, eta_seconds))
+
+                # Get Aircraft Types using resolver, one cache query for the batch
+                aircraft_types = resolve_aircraft_types([aircraft['icao24'] for aircraft, _ in approaching])
+
+                formatted_aircraft = []
+
+                for aircraft, eta_seconds in approaching:
+                    aircraft_type = aircraft_types[aircraft['icao24']]
 
                     # Convert altitude and speed
                     altitude_ft = aircraft['baro_altitude'] * 3.28084 if aircraft['baro_altitude'] else 0
@@ -203,27 +271,12 @@ class AircraftTracker:
             return
         
         # Serialize message
-        message_json = json.dumps(message)
+        message_json = dumps_message(message)
         
-        # Send to appropriate clients
-        disconnected_clients = set()
-        for client in clients_to_notify:
-            try:
-                await client.send(message_json)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected_clients.add(client)
-            except Exception as e:
-                logger.error(f"Error sending to client: {e}")
-                disconnected_clients.add(client)
-        
-        # Remove disconnected clients from all sets
-        self.connected_clients -= disconnected_clients
-        self.tracking_clients -= disconnected_clients
-        for client in disconnected_clients:
-            self.client_types.pop(client, None)
-        
-        if disconnected_clients:
-            logger.info(f"Removed {len(disconnected_clients)} disconnected clients")
+        # Encode the frame once and write it to every open connection without
+        # awaiting each send. Closed connections are skipped here and removed
+        # from the client sets when their handle_client() exits.
+        websockets.broadcast(clients_to_notify, message_json)
     
     def cleanup_old_aircraft(self) -> None:
         """Remove old aircraft entries to prevent memory leaks."""
@@ -246,10 +299,16 @@ class AircraftTracker:
             logger.info(f"Cleaned up {len(old_spotted)} spotted and {len(old_visible)} visible aircraft entries")
     
     async def periodic_cleanup(self) -> None:
-        """Periodically clean up old aircraft entries."""
+        """Periodically clean up old aircraft entries and expired cache rows."""
         while self.is_polling:
             await asyncio.sleep(self.CLEANUP_INTERVAL_SECONDS)
             self.cleanup_old_aircraft()
+            
+            # Drop cached aircraft details nobody has refreshed within the expiry window
+            try:
+                cleanup_old_cache(max_age_hours=Config.CACHE_EXPIRY_DAYS * 24)
+            except Exception as e:
+                logger.error(f"Error cleaning up aircraft cache: {e}")
     
     async def _set_default_client_type(self, websocket: WebSocketServerProtocol) -> None:
         """Set default client type if not identified within timeout."""
@@ -388,19 +447,21 @@ class AircraftTracker:
             'timestamp': datetime.utcnow().isoformat(),
             'message': 'Connected to Brum Brum Tracker'
         }
-        await websocket.send(json.dumps(welcome_msg))
         
         # Send last aircraft data if available, otherwise send searching message
         if self.last_aircraft_data:
-            await websocket.send(json.dumps(self.last_aircraft_data))
+            status_msg = self.last_aircraft_data
         else:
             # Send initial searching message
-            searching_msg = {
+            status_msg = {
                 'type': 'searching',
                 'timestamp': datetime.utcnow().isoformat(),
                 'message': 'Searching for aircraft...'
             }
-            await websocket.send(json.dumps(searching_msg))
+        
+        # Clients expect the welcome frame first, so send in order
+        await websocket.send(dumps_message(welcome_msg))
+        await websocket.send(dumps_message(status_msg))
         
         # Don't start polling yet - wait for client identification
         # Default to tracking client if not identified within 5 seconds
@@ -411,7 +472,7 @@ class AircraftTracker:
             async for message in websocket:
                 # Handle client messages if needed (e.g., configuration)
                 try:
-                    data = json.loads(message)
+                    data = loads_message(message)
                     logger.debug(f"Received from client: {data}")
                     
                     # Handle batched messages
@@ -474,13 +535,13 @@ class AircraftTracker:
                 logger.info(f"Non-tracking client connected: {client_type}")
                 
         elif data.get('type') == 'get_logbook':
-            since = data.get('since') if data.get('since') else None
+            since = parse_since(data.get('since'))
             log_data = get_logbook(since=since) # Pass it to the get_logbook function
             response = {
                 'type': 'logbook_data',
                 'log': log_data
             }
-            await websocket.send(json.dumps(response))
+            await websocket.send(dumps_message(response))
         elif data.get('type') == 'get_unidentified_aircraft':
             # Get unidentified aircraft log
             limit = data.get('limit', 100)
@@ -490,26 +551,13 @@ class AircraftTracker:
                 'type': 'unidentified_aircraft_log',
                 'aircraft': unidentified_log
             }
-            await websocket.send(json.dumps(response))
+            await websocket.send(dumps_message(response))
         elif data.get('type') == 'get_config':
             # Send configuration to frontend
-            config_response = {
-                'type': 'config',
-                'config': {
-                    'home': {
-                        'lat': Config.HOME_LAT,
-                        'lon': Config.HOME_LON
-                    },
-                    'search': {
-                        'radiusKm': Config.SEARCH_RADIUS_KM,
-                        'minElevationAngle': Config.MIN_ELEVATION_ANGLE
-                    }
-                }
-            }
-            await websocket.send(json.dumps(config_response))
+            await websocket.send(self.config_message)
         else:
             # Echo back other messages for now
-            await websocket.send(json.dumps({
+            await websocket.send(dumps_message({
                 'type': 'echo',
                 'data': data
             }))
@@ -528,25 +576,54 @@ async def websocket_handler(websocket):
 
 
 
+def _start_log_listener() -> logging.handlers.QueueListener:
+    """Route log records through a queue to a background writer thread."""
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    for handler in _log_handlers:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(log_queue, *_log_handlers)
+    listener.start()
+    return listener
+
+
+def _stop_log_listener(listener: logging.handlers.QueueListener) -> None:
+    """Write log records directly again and flush whatever is still queued."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+    for handler in _log_handlers:
+        root.addHandler(handler)
+    
+    listener.stop()
+
+
 async def main():
     """Main server entry point."""
-    logger.info(f"Starting WebSocket server on {Config.WEBSOCKET_HOST}:{Config.WEBSOCKET_PORT}")
-    
-    # Start WebSocket server with additional parameters for better compatibility
-    async with websockets.serve(
-        websocket_handler,
-        Config.WEBSOCKET_HOST,
-        Config.WEBSOCKET_PORT,
-        # Additional parameters for better connection handling
-        compression=None,  # Disable compression for better compatibility
-        max_size=10 * 1024 * 1024,  # 10MB max message size
-        ping_interval=20,  # Send ping every 20 seconds
-        ping_timeout=10,  # Wait 10 seconds for pong
-        close_timeout=10,  # Wait 10 seconds for close
-    ):
-        logger.info(f"Server running at ws://{Config.WEBSOCKET_HOST}:{Config.WEBSOCKET_PORT}/ws")
-        logger.info("WebSocket parameters: compression=None, ping_interval=20s")
-        await asyncio.Future()  # Run forever
+    log_listener = _start_log_listener()
+    try:
+        logger.info(f"Starting WebSocket server on {Config.WEBSOCKET_HOST}:{Config.WEBSOCKET_PORT}")
+        
+        # Start WebSocket server with additional parameters for better compatibility
+        async with websockets.serve(
+            websocket_handler,
+            Config.WEBSOCKET_HOST,
+            Config.WEBSOCKET_PORT,
+            # Additional parameters for better connection handling
+            compression=None,  # Disable compression for better compatibility
+            max_size=10 * 1024 * 1024,  # 10MB max message size
+            ping_interval=20,  # Send ping every 20 seconds
+            ping_timeout=10,  # Wait 10 seconds for pong
+            close_timeout=10,  # Wait 10 seconds for close
+        ):
+            logger.info(f"Server running at ws://{Config.WEBSOCKET_HOST}:{Config.WEBSOCKET_PORT}/ws")
+            logger.info("WebSocket parameters: compression=None, ping_interval=20s")
+            await asyncio.Future()  # Run forever
+    finally:
+        _stop_log_listener(log_listener)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,8 @@ import logging
 import requests
 from typing import Dict, Optional
 
+from backend.api.api_pool import get_global_pool
+
 logger = logging.getLogger(__name__)
 
 # Constants
@@ -19,7 +21,7 @@ def fetch_aircraft_details_from_hexdb(icao24: str) -> Optional[Dict]:
     """
     try:
         url = f"{HEXDB_BASE_URL}/aircraft/{icao24.lower()}"
-        response = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=REQUEST_TIMEOUT)
+        response = get_global_pool().get(url, headers={'User-Agent': USER_AGENT}, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         logger.debug(f"No aircraft details found in hexdb for ICAO24: {icao24}")
@@ -36,7 +38,7 @@ def fetch_flight_route_from_hexdb(callsign: str) -> Optional[Dict]:
         return None
     try:
         url = f"{HEXDB_BASE_URL}/route/icao/{callsign}"
-        response = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=REQUEST_TIMEOUT)
+        response = get_global_pool().get(url, headers={'User-Agent': USER_AGENT}, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         return None
@@ -52,7 +54,7 @@ def fetch_airport_info_from_hexdb(icao: str) -> Optional[Dict]:
         return None
     try:
         url = f"{HEXDB_BASE_URL}/airport/icao/{icao}"
-        response = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=REQUEST_TIMEOUT)
+        response = get_global_pool().get(url, headers={'User-Agent': USER_AGENT}, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         return None
@@ -5,7 +5,23 @@ Geometry utilities for calculating distances, bearings, and elevation angles.
 import math
 from typing import Tuple
 
+try:
+    from numba import njit
 
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function as plain Python."""
+        def decorator(func):
+            return func
+        return decorator
+
+_DEGREES_PER_RADIAN = 180.0 / math.pi
+
+
+@njit(cache=True, fastmath=True)
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate the great circle distance between two points on Earth.
@@ -35,11 +51,42 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     # Haversine formula
     a = (math.sin(dlat / 2) ** 2 + 
          math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    # asin form: one sqrt instead of two and no atan2; rounding can push
+    # a a hair above 1 for antipodal points, so clamp before the asin
+    c = 2 * math.asin(min(1.0, math.sqrt(a)))
     
     return R * c
 
 
+@njit(cache=True, fastmath=True)
+def equirectangular_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Approximate the distance between two nearby points on Earth.
+    
+    Uses one cosine and one square root instead of the full haversine
+    formula; within a few hundred kilometers it agrees with
+    haversine_distance to well under 0.1%.
+    
+    Args:
+        lat1: Latitude of first point in degrees
+        lon1: Longitude of first point in degrees
+        lat2: Latitude of second point in degrees
+        lon2: Longitude of second point in degrees
+        
+    Returns:
+        Distance in kilometers
+    """
+    # Earth's radius in kilometers
+    R = 6371.0
+    
+    mean_lat_rad = math.radians((lat1 + lat2) / 2)
+    x = math.radians(lon2 - lon1) * math.cos(mean_lat_rad)
+    y = math.radians(lat2 - lat1)
+    
+    return R * math.sqrt(x * x + y * y)
+
+
+@njit(cache=True, fastmath=True)
 def bearing_between(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate the bearing from point 1 to point 2.
@@ -72,6 +119,47 @@ def bearing_between(lat1: float, lon1: float, lat2: float, lon2: float) -> float
     return (bearing + 360) % 360
 
 
+@njit(cache=True, fastmath=True)
+def bearings_from_origin(sin_lat1: float, cos_lat1: float, lon1: float,
+                         lat2: float, lon2: float) -> Tuple[float, float]:
+    """
+    Calculate the bearings from point 1 to point 2 and from point 2 back.
+    
+    Equivalent to calling bearing_between() in both directions, but the
+    origin's latitude is passed in pre-computed so a fixed origin (the home
+    location) doesn't pay for its sin/cos on every call, and the two
+    bearings share the remaining trigonometry.
+    
+    Args:
+        sin_lat1: Sine of the origin latitude
+        cos_lat1: Cosine of the origin latitude
+        lon1: Longitude of origin point in degrees
+        lat2: Latitude of destination point in degrees
+        lon2: Longitude of destination point in degrees
+        
+    Returns:
+        Tuple of (bearing 1 -> 2, bearing 2 -> 1) in degrees (0-359)
+    """
+    lat2_rad = math.radians(lat2)
+    sin_lat2 = math.sin(lat2_rad)
+    cos_lat2 = math.cos(lat2_rad)
+    
+    dlon = math.radians(lon2 - lon1)
+    sin_dlon = math.sin(dlon)
+    cos_dlon = math.cos(dlon)
+    
+    forward = math.degrees(math.atan2(
+        sin_dlon * cos_lat2,
+        cos_lat1 * sin_lat2 - sin_lat1 * cos_lat2 * cos_dlon
+    ))
+    reverse = math.degrees(math.atan2(
+        -sin_dlon * cos_lat1,
+        cos_lat2 * sin_lat1 - sin_lat2 * cos_lat1 * cos_dlon
+    ))
+    return (forward + 360) % 360, (reverse + 360) % 360
+
+
+@njit(cache=True, fastmath=True)
 def elevation_angle(distance_km: float, altitude_m: float) -> float:
     """
     Calculate the elevation angle to an aircraft.
@@ -86,17 +174,12 @@ def elevation_angle(distance_km: float, altitude_m: float) -> float:
     # Convert distance to meters for consistent units
     distance_m = distance_km * 1000
     
-    # Avoid division by zero
-    if distance_m == 0:
-        return 90.0 if altitude_m > 0 else 0.0
-    
-    # Calculate angle using arctangent
-    angle_rad = math.atan(altitude_m / distance_m)
-    
-    # Convert to degrees
-    return math.degrees(angle_rad)
+    # atan2 needs no division, so directly overhead (distance 0) comes out
+    # as 90° and zero altitude as 0° without special-casing
+    return _DEGREES_PER_RADIAN * math.atan2(altitude_m, distance_m)
 
 
+@njit(cache=True, fastmath=True)
 def is_plane_approaching(home_bearing: float, plane_bearing: float, 
                         true_track: float, threshold: float = 90.0) -> bool:
     """
@@ -8,6 +8,9 @@ import subprocess
 import argparse
 from pathlib import Path
 
+# Same configuration arguments as the CI workflow
+PYTEST_CONFIG_ARGS = ['-c', 'config/pytest.ini', '--rootdir=.']
+
 
 def run_command(cmd, description):
     """Run a command and report results."""
@@ -46,7 +49,7 @@ def main():
     # Install dependencies if requested
     if args.install:
         print("Installing test dependencies...")
-        if not run_command([sys.executable, '-m', 'pip', 'install', '-r', 'requirements-test.txt'], 
+        if not run_command([sys.executable, '-m', 'pip', 'install', '-r', 'config/requirements-test.txt'], 
                           'Install test dependencies'):
             return 1
     
@@ -54,14 +57,15 @@ def main():
     
     # Run unit tests
     if args.unit or args.all:
-        cmd = [sys.executable, '-m', 'pytest', 'tests/unit', '-v', '-m', 'unit']
+        cmd = [sys.executable, '-m', 'pytest', *PYTEST_CONFIG_ARGS, 'tests/unit', '-v', '-m', 'unit']
         if args.coverage or args.all:
             cmd.extend(['--cov=backend', '--cov-report=html', '--cov-report=term'])
         success &= run_command(cmd, 'Unit Tests')
     
     # Run integration tests
     if args.integration or args.all:
-        cmd = [sys.executable, '-m', 'pytest', 'tests/integration', '-v', '-m', 'integration']
+        cmd = [sys.executable, '-m', 'pytest', *PYTEST_CONFIG_ARGS, 'tests/integration', '-v', '-m', 'integration',
+               '-n', 'auto']
         success &= run_command(cmd, 'Integration Tests')
     
     # Run linting
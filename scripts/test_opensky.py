@@ -19,6 +19,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Import our config after path is set
 from backend.utils.config import Config
 
+# One session for every probe so the token and API requests reuse pooled
+# keep-alive connections instead of a fresh TCP/TLS handshake per call
+session = requests.Session()
+
 def print_header(text: str):
     """Print a formatted header."""
     print(f"\n{'='*60}")
@@ -69,7 +73,7 @@ def test_direct_api_call(bbox: Tuple[float, float, float, float], auth_token: Op
         print("Using anonymous access")
     
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=30)
+        response = session.get(url, params=params, headers=headers, timeout=30)
         print(f"\nResponse Status: {response.status_code}")
         print(f"Response Headers: {dict(response.headers)}")
         
@@ -97,7 +101,7 @@ def get_oauth_token(username: str, password: str) -> Optional[str]:
     }
     
     try:
-        response = requests.post(token_url, data=data, timeout=10)
+        response = session.post(token_url, data=data, timeout=10)
         if response.status_code == 200:
             token_data = response.json()
             return token_data.get('access_token')
@@ -219,7 +223,7 @@ def main():
         headers['Authorization'] = f'Bearer {auth_token}'
     
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = session.get(url, headers=headers, timeout=30)
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
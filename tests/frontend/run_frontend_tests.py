@@ -7,7 +7,7 @@ import os
 import sys
 import time
 import webbrowser
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from threading import Thread
 
 class TestHTTPRequestHandler(SimpleHTTPRequestHandler):
@@ -20,10 +20,16 @@ class TestHTTPRequestHandler(SimpleHTTPRequestHandler):
         # Suppress normal HTTP logging
         pass
 
+class TestHTTPServer(ThreadingHTTPServer):
+    # Serve the browser's parallel asset requests on their own threads.
+    # The backlog has to be set on the class since listen() runs in __init__.
+    request_queue_size = 128
+    daemon_threads = True
+
 def run_test_server(port=8888):
     """Run HTTP server for frontend tests"""
     server_address = ('', port)
-    httpd = HTTPServer(server_address, TestHTTPRequestHandler)
+    httpd = TestHTTPServer(server_address, TestHTTPRequestHandler)
     
     print(f"Frontend test server running on http://localhost:{port}")
     print(f"Open http://localhost:{port}/tests/frontend/test-runner.html to run tests")
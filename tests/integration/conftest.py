@@ -0,0 +1,34 @@
+"""
+Shared configuration for integration tests.
+
+The suite is dominated by WebSocket connect/send/recv cycles, so its event
+loops run on uvloop when it is installed. The loop is chosen per test through
+pytest-asyncio rather than by swapping the global policy at import time.
+"""
+
+import pytest
+import pytest_asyncio.plugin
+
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# pytest-asyncio 1.4 replaced the event_loop_policy fixture with a
+# loop-factory hook and deprecated overriding the fixture
+LOOP_FACTORY_HOOK_AVAILABLE = hasattr(pytest_asyncio.plugin, 'PytestAsyncioSpecs')
+
+
+if UVLOOP_AVAILABLE and LOOP_FACTORY_HOOK_AVAILABLE:
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_asyncio_loop_factories(config, item):
+        """Create the integration tests' event loops with uvloop."""
+        return {'uvloop': uvloop.new_event_loop}
+
+elif UVLOOP_AVAILABLE:
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """Run the integration tests on uvloop's event loop policy."""
+        return uvloop.EventLoopPolicy()
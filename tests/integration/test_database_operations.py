@@ -9,43 +9,36 @@ Tests database functions including:
 
 import pytest
 import sqlite3
-import tempfile
-import os
-import sys
 from datetime import datetime, timedelta
 
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-
-from backend.db import (
-    init_db,
+from backend.database import db
+from backend.database.db import (
+    AircraftDatabase,
     add_to_logbook,
     get_logbook,
-    add_to_cache,
+    save_aircraft_to_cache,
     get_aircraft_from_cache,
     cleanup_old_cache
 )
 
 
 @pytest.fixture
-def temp_db():
-    """Create a temporary database for testing."""
-    fd, path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
+def temp_db(tmp_path, monkeypatch):
+    """Create a file-backed database for testing."""
+    # Connections opened in test mode skip fsync and keep the journal in memory
+    monkeypatch.setenv('BRUM_TEST_MODE', '1')
+    
+    # A real file per test keeps tests isolated and lets concurrent
+    # connections use ordinary file locking, which busy_timeout retries
+    path = str(tmp_path / 'test_aircraft.db')
     
     # Override the default database path
-    import backend.db
-    original_db_path = backend.db.DB_PATH
-    backend.db.DB_PATH = path
+    monkeypatch.setattr(db, 'DB_PATH', path)
     
     # Initialize the database
-    init_db()
+    AircraftDatabase().close()
     
     yield path
-    
-    # Cleanup
-    backend.db.DB_PATH = original_db_path
-    os.unlink(path)
 
 
 def test_database_initialization(temp_db):
@@ -55,15 +48,15 @@ def test_database_initialization(temp_db):
     
     # Check logbook table exists
     cursor.execute("""
-        SELECT name FROM sqlite_master 
+        SELECT name FROM sqlite_master
         WHERE type='table' AND name='logbook'
     """)
     assert cursor.fetchone() is not None
     
-    # Check aircraft_cache table exists
+    # Check aircraft table exists
     cursor.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='aircraft_cache'
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name='aircraft'
     """)
     assert cursor.fetchone() is not None
     
@@ -80,8 +73,8 @@ def test_add_to_logbook(temp_db):
     assert len(logbook) == 1
     assert logbook[0]['aircraft_type'] == 'Boeing 737'
     assert logbook[0]['image_url'] == 'https://example.com/image.jpg'
-    assert 'id' in logbook[0]
-    assert 'spotted_at' in logbook[0]
+    assert logbook[0]['sighting_count'] == 1
+    assert logbook[0]['first_spotted'] is not None
 
 
 def test_get_logbook_with_since(temp_db):
@@ -95,40 +88,33 @@ def test_get_logbook_with_since(temp_db):
     assert len(all_entries) == 2
     
     # Get entries since a future timestamp (should be empty)
-    future_time = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    future_time = datetime.utcnow() + timedelta(hours=1)
     recent_entries = get_logbook(since=future_time)
     assert len(recent_entries) == 0
     
     # Get entries since a past timestamp (should get all)
-    past_time = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+    past_time = datetime.utcnow() - timedelta(hours=1)
     past_entries = get_logbook(since=past_time)
     assert len(past_entries) == 2
 
 
-def test_add_to_cache(temp_db):
+def test_save_aircraft_to_cache(temp_db):
     """Test adding aircraft to cache."""
     aircraft_data = {
-        'icao24': 'abc123',
+        'icao24': 'ABC123',
         'image_url': 'https://example.com/plane.jpg',
-        'aircraft_type': 'Boeing 747',
-        'registration': 'N12345'
+        'type': 'Boeing 747'
     }
     
-    add_to_cache('abc123', aircraft_data)
+    save_aircraft_to_cache(aircraft_data)
     
-    # Verify it was added
+    # Verify it was added under the lower-cased icao24
     conn = sqlite3.connect(temp_db)
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM aircraft_cache WHERE icao24 = ?", ('abc123',))
+    cursor.execute("SELECT icao24, type FROM aircraft WHERE icao24 = ?", ('abc123',))
     row = cursor.fetchone()
     
-    assert row is not None
-    assert row[0] == 'abc123'  # icao24
-    
-    # Parse JSON data
-    import json
-    data = json.loads(row[1])
-    assert data['aircraft_type'] == 'Boeing 747'
+    assert row == ('abc123', 'Boeing 747')
     
     conn.close()
 
@@ -139,17 +125,17 @@ def test_get_aircraft_from_cache(temp_db):
     aircraft_data = {
         'icao24': 'def456',
         'image_url': 'https://example.com/plane2.jpg',
-        'aircraft_type': 'Airbus A380'
+        'type': 'Airbus A380'
     }
     
-    add_to_cache('def456', aircraft_data)
+    save_aircraft_to_cache(aircraft_data)
     
     # Retrieve from cache
-    cached_data = get_aircraft_from_cache('def456')
+    cached_data = get_aircraft_from_cache('DEF456')
     
     assert cached_data is not None
     assert cached_data['icao24'] == 'def456'
-    assert cached_data['aircraft_type'] == 'Airbus A380'
+    assert cached_data['type'] == 'Airbus A380'
     
     # Try non-existent aircraft
     missing_data = get_aircraft_from_cache('xyz999')
@@ -157,31 +143,31 @@ def test_get_aircraft_from_cache(temp_db):
 
 
 def test_cache_expiry(temp_db):
-    """Test that cache entries expire after 24 hours."""
+    """Test that cache entries older than 24 hours stop being served."""
     conn = sqlite3.connect(temp_db)
-    cursor = conn.cursor()
     
     # Add an old entry directly
-    old_time = datetime.utcnow() - timedelta(hours=25)
-    cursor.execute("""
-        INSERT INTO aircraft_cache (icao24, data, cached_at)
-        VALUES (?, ?, ?)
-    """, ('old123', '{"test": "data"}', old_time.isoformat()))
+    old_time = (datetime.utcnow() - timedelta(hours=25)).strftime('%Y-%m-%d %H:%M:%S')
+    with conn:
+        conn.execute("""
+            INSERT INTO aircraft (icao24, image_url, type, last_updated)
+            VALUES (?, ?, ?, ?)
+        """, ('old123', '', 'Boeing 737', old_time))
+    conn.close()
     
     # Add a recent entry
-    add_to_cache('new123', {'test': 'recent'})
+    save_aircraft_to_cache({'icao24': 'new123', 'image_url': '', 'type': 'Airbus A320'})
     
-    conn.commit()
+    # Reads never expire entries; the periodic cleanup does
+    cleanup_old_cache(max_age_hours=24)
     
     # Old entry should not be retrievable
-    old_data = get_aircraft_from_cache('old123')
-    assert old_data is None
+    assert get_aircraft_from_cache('old123') is None
     
     # New entry should be retrievable
     new_data = get_aircraft_from_cache('new123')
     assert new_data is not None
-    
-    conn.close()
+    assert new_data['type'] == 'Airbus A320'
 
 
 def test_cleanup_old_cache(temp_db):
@@ -189,46 +175,52 @@ def test_cleanup_old_cache(temp_db):
     conn = sqlite3.connect(temp_db)
     cursor = conn.cursor()
     
-    # Add old entries
-    old_time = datetime.utcnow() - timedelta(hours=25)
-    for i in range(3):
-        cursor.execute("""
-            INSERT INTO aircraft_cache (icao24, data, cached_at)
-            VALUES (?, ?, ?)
-        """, (f'old{i}', '{"test": "data"}', old_time.isoformat()))
-    
-    # Add recent entries
-    for i in range(2):
-        add_to_cache(f'new{i}', {'test': 'recent'})
-    
-    conn.commit()
+    # Add old and recent entries in a single transaction
+    now = datetime.utcnow()
+    old_time = (now - timedelta(hours=25)).strftime('%Y-%m-%d %H:%M:%S')
+    new_time = now.strftime('%Y-%m-%d %H:%M:%S')
+    rows = [(f'old{i}', '', 'B738', old_time) for i in range(3)]
+    rows += [(f'new{i}', '', 'A320', new_time) for i in range(2)]
+    with conn:
+        cursor.executemany("""
+            INSERT INTO aircraft (icao24, image_url, type, last_updated)
+            VALUES (?, ?, ?, ?)
+        """, rows)
     
     # Count before cleanup
-    cursor.execute("SELECT COUNT(*) FROM aircraft_cache")
+    cursor.execute("SELECT COUNT(*) FROM aircraft")
     count_before = cursor.fetchone()[0]
     assert count_before == 5
     
     # Run cleanup
-    cleanup_old_cache()
+    removed = cleanup_old_cache()
+    assert removed == 3
     
-    # Count after cleanup
-    cursor.execute("SELECT COUNT(*) FROM aircraft_cache")
-    count_after = cursor.fetchone()[0]
-    assert count_after == 2  # Only recent entries remain
+    # Only recent entries remain
+    cursor.execute("SELECT icao24 FROM aircraft ORDER BY icao24")
+    assert [row[0] for row in cursor.fetchall()] == ['new0', 'new1']
     
     conn.close()
 
 
+def test_cleanup_old_cache_uses_index(temp_db):
+    """Test that cleanup range-scans last_updated instead of the whole table."""
+    conn = sqlite3.connect(temp_db)
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM aircraft WHERE last_updated < datetime('now', ?)",
+        ('-24 hours',)
+    ).fetchall()
+    conn.close()
+    
+    assert 'idx_aircraft_last_updated' in str(plan)
+
+
 def test_logbook_ordering(temp_db):
     """Test that logbook entries are returned in correct order."""
-    # Add entries with slight delays
-    import time
-    
-    add_to_logbook('First', 'url1')
-    time.sleep(0.1)
-    add_to_logbook('Second', 'url2')
-    time.sleep(0.1)
-    add_to_logbook('Third', 'url3')
+    # Add entries with explicit, strictly increasing timestamps
+    add_to_logbook('First', 'url1', spotted_at='2024-01-01 00:00:00')
+    add_to_logbook('Second', 'url2', spotted_at='2024-01-01 00:00:01')
+    add_to_logbook('Third', 'url3', spotted_at='2024-01-01 00:00:02')
     
     # Get logbook - should be in reverse chronological order
     logbook = get_logbook()
@@ -239,6 +231,28 @@ def test_logbook_ordering(temp_db):
     assert logbook[2]['aircraft_type'] == 'First'
 
 
+def test_logbook_out_of_order_sightings(temp_db):
+    """Test that out-of-order sightings keep the earliest and latest timestamps."""
+    add_to_logbook('Boeing 737', 'url1', spotted_at='2024-01-01 12:00:00')
+    add_to_logbook('Boeing 737', 'url1', spotted_at='2024-01-01 10:00:00')
+    add_to_logbook('Airbus A320', 'url2', spotted_at='2024-01-01 11:30:00')
+    add_to_logbook('Boeing 737', 'url1', spotted_at='2024-01-01 11:00:00')
+    
+    logbook = get_logbook()
+    
+    # Newest first sighting comes first
+    assert [entry['aircraft_type'] for entry in logbook] == ['Airbus A320', 'Boeing 737']
+    
+    boeing = logbook[1]
+    assert boeing['first_spotted'] == '2024-01-01 10:00:00'
+    assert boeing['last_spotted'] == '2024-01-01 12:00:00'
+    assert boeing['sighting_count'] == 3
+    
+    airbus = logbook[0]
+    assert airbus['first_spotted'] == airbus['last_spotted'] == '2024-01-01 11:30:00'
+    assert airbus['sighting_count'] == 1
+
+
 def test_concurrent_database_access(temp_db):
     """Test that concurrent database access works correctly."""
     import threading
@@ -277,4 +291,4 @@ def test_concurrent_database_access(temp_db):
 
 
 if __name__ == '__main__':
-    pytest.main([__file__, '-v'])
\ No newline at end of file
+    pytest.main([__file__, '-v'])
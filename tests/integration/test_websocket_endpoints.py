@@ -9,25 +9,49 @@ Tests the WebSocket server endpoints including:
 """
 
 import asyncio
-import json
 import pytest
+import pytest_asyncio
 import websockets
 from unittest.mock import patch
-import os
-import sys
+from datetime import datetime
 
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from backend.server import AircraftTracker, dumps_message, loads_message
+from backend.utils import auth
+from backend.utils.auth import AuthManager
 
-from backend.server import AircraftTracker
 
+# Run every test on one module-wide event loop so they can share the server
+pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-@pytest.fixture
+# Fixed request payloads, encoded once
+_GET_CONFIG_REQ = dumps_message({'type': 'get_config'})
+_GET_LOGBOOK_REQ = dumps_message({'type': 'get_logbook'})
+_AUTH_LOGIN_REQ = dumps_message({
+    'type': 'auth_login',
+    'username': 'testuser',
+    'password': 'testpass'
+})
+
+# Fail fast if an expected frame never arrives instead of hanging until the
+# pytest timeout
+RECV_TIMEOUT = 2.0
+
+
+async def _recv(websocket):
+    """Receive the next frame, failing if it does not arrive in time."""
+    return await asyncio.wait_for(websocket.recv(), timeout=RECV_TIMEOUT)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
 async def websocket_server():
-    """Start a test WebSocket server."""
+    """Start a test WebSocket server shared by the tests in this module."""
     tracker = AircraftTracker()
+    
+    async def handler(websocket):
+        await tracker.handle_client(websocket, getattr(websocket, 'path', '/'))
+    
     server = await websockets.serve(
-        tracker.handle_client,
+        handler,
         'localhost',
         0  # Use any available port
     )
@@ -42,32 +66,31 @@ async def websocket_server():
     await server.wait_closed()
 
 
-@pytest.mark.asyncio
 async def test_websocket_connection(websocket_server):
     """Test basic WebSocket connection."""
     async with websockets.connect(websocket_server) as websocket:
         # Should receive welcome message
-        message = await websocket.recv()
-        data = json.loads(message)
+        message = await _recv(websocket)
+        data = loads_message(message)
         
         assert data['type'] == 'welcome'
         assert 'timestamp' in data
         assert data['message'] == 'Connected to Brum Brum Tracker'
 
 
-@pytest.mark.asyncio
 async def test_get_config_endpoint(websocket_server):
     """Test get_config WebSocket endpoint."""
     async with websockets.connect(websocket_server) as websocket:
-        # Skip welcome message
-        await websocket.recv()
+        # Skip welcome and status messages (read, not parsed)
+        await _recv(websocket)
+        await _recv(websocket)
         
         # Send get_config request
-        await websocket.send(json.dumps({'type': 'get_config'}))
+        await websocket.send(_GET_CONFIG_REQ)
         
         # Wait for response
-        message = await websocket.recv()
-        data = json.loads(message)
+        message = await _recv(websocket)
+        data = loads_message(message)
         
         assert data['type'] == 'config'
         assert 'config' in data
@@ -78,7 +101,6 @@ async def test_get_config_endpoint(websocket_server):
         assert 'radiusKm' in data['config']['search']
 
 
-@pytest.mark.asyncio
 async def test_get_logbook_endpoint(websocket_server):
     """Test get_logbook WebSocket endpoint."""
     # Mock the database function
@@ -93,15 +115,16 @@ async def test_get_logbook_endpoint(websocket_server):
         ]
         
         async with websockets.connect(websocket_server) as websocket:
-            # Skip welcome message
-            await websocket.recv()
+            # Skip welcome and status messages (read, not parsed)
+            await _recv(websocket)
+            await _recv(websocket)
             
             # Send get_logbook request
-            await websocket.send(json.dumps({'type': 'get_logbook'}))
+            await websocket.send(_GET_LOGBOOK_REQ)
             
             # Wait for response
-            message = await websocket.recv()
-            data = json.loads(message)
+            message = await _recv(websocket)
+            data = loads_message(message)
             
             assert data['type'] == 'logbook_data'
             assert 'log' in data
@@ -109,151 +132,147 @@ async def test_get_logbook_endpoint(websocket_server):
             assert data['log'][0]['aircraft_type'] == 'Boeing 737'
 
 
-@pytest.mark.asyncio
 async def test_get_logbook_with_since_parameter(websocket_server):
     """Test get_logbook with since parameter."""
     with patch('backend.server.get_logbook') as mock_get_logbook:
         mock_get_logbook.return_value = []
         
         async with websockets.connect(websocket_server) as websocket:
-            # Skip welcome message
-            await websocket.recv()
+            # Skip welcome and status messages (read, not parsed)
+            await _recv(websocket)
+            await _recv(websocket)
             
             # Send get_logbook request with since parameter
-            await websocket.send(json.dumps({
+            await websocket.send(dumps_message({
                 'type': 'get_logbook',
                 'since': '2025-06-26T00:00:00'
             }))
             
             # Wait for response
-            message = await websocket.recv()
-            data = json.loads(message)
+            message = await _recv(websocket)
+            data = loads_message(message)
             
-            # Verify the function was called with since parameter
-            mock_get_logbook.assert_called_once_with(since='2025-06-26T00:00:00')
+            # Verify the function was called with the parsed since parameter
+            mock_get_logbook.assert_called_once()
+            assert mock_get_logbook.call_args.kwargs['since'] == datetime(2025, 6, 26)
             
             assert data['type'] == 'logbook_data'
             assert data['log'] == []
 
 
-@pytest.mark.asyncio
 async def test_invalid_message_type(websocket_server):
     """Test handling of invalid message types."""
     async with websockets.connect(websocket_server) as websocket:
-        # Skip welcome message
-        await websocket.recv()
+        # Skip welcome and status messages (read, not parsed)
+        await _recv(websocket)
+        await _recv(websocket)
         
         # Send invalid message type
-        await websocket.send(json.dumps({'type': 'invalid_type'}))
+        await websocket.send(dumps_message({'type': 'invalid_type'}))
         
-        # Should not crash, just log debug message
-        # Give it a moment to process
-        await asyncio.sleep(0.1)
+        # Should not crash, unknown types are echoed back
+        message = await _recv(websocket)
+        assert loads_message(message)['type'] == 'echo'
         
-        # Connection should still be alive
-        await websocket.ping()
+        # Connection should still be alive and serving requests
+        await websocket.send(_GET_CONFIG_REQ)
+        message = await _recv(websocket)
+        assert loads_message(message)['type'] == 'config'
 
 
-@pytest.mark.asyncio
 async def test_malformed_json(websocket_server):
     """Test handling of malformed JSON."""
     async with websockets.connect(websocket_server) as websocket:
-        # Skip welcome message
-        await websocket.recv()
+        # Skip welcome and status messages (read, not parsed)
+        await _recv(websocket)
+        await _recv(websocket)
         
         # Send malformed JSON
         await websocket.send('{"invalid json')
         
-        # Should not crash
-        await asyncio.sleep(0.1)
-        
-        # Connection should still be alive
-        await websocket.ping()
+        # Should not crash; a reply to the next request proves the bad
+        # frame was processed and the connection is still alive
+        await websocket.send(_GET_CONFIG_REQ)
+        message = await _recv(websocket)
+        assert loads_message(message)['type'] == 'config'
 
 
-@pytest.mark.asyncio
-async def test_authentication_flow():
+async def test_authentication_flow(monkeypatch):
     """Test authentication flow when enabled."""
-    # Set up environment for auth
-    os.environ['AUTH_ENABLED'] = 'true'
-    os.environ['AUTH_USERNAME'] = 'testuser'
-    os.environ['AUTH_PASSWORD'] = 'testpass'
+    # Set up environment for auth; monkeypatch restores it afterwards
+    monkeypatch.setenv('AUTH_ENABLED', 'true')
+    monkeypatch.setenv('AUTH_USERNAME', 'testuser')
+    monkeypatch.setenv('AUTH_PASSWORD', 'testpass')
+    
+    # AuthManager reads the environment when constructed, so install a fresh
+    # one in place of the module-level instance used by require_auth
+    monkeypatch.setattr(auth, 'auth_manager', AuthManager())
+    
+    # Create a new tracker with auth enabled
+    tracker = AircraftTracker()
+    
+    async def handler(websocket):
+        await tracker.handle_client(websocket, getattr(websocket, 'path', '/'))
+    
+    server = await websockets.serve(
+        handler,
+        'localhost',
+        0
+    )
+    
+    port = server.sockets[0].getsockname()[1]
     
     try:
-        # Need to import after setting env vars
-        from backend.auth import AuthManager
-        auth_manager = AuthManager()
-        
-        # Create a new tracker with auth enabled
-        tracker = AircraftTracker()
-        server = await websockets.serve(
-            tracker.handle_client,
-            'localhost',
-            0
-        )
-        
-        port = server.sockets[0].getsockname()[1]
-        
         async with websockets.connect(f'ws://localhost:{port}') as websocket:
             # Should receive auth_required message
-            message = await websocket.recv()
-            data = json.loads(message)
+            message = await _recv(websocket)
+            data = loads_message(message)
             
             assert data['type'] == 'auth_required'
             
             # Send login credentials
-            await websocket.send(json.dumps({
-                'type': 'auth_login',
-                'username': 'testuser',
-                'password': 'testpass'
-            }))
+            await websocket.send(_AUTH_LOGIN_REQ)
             
             # Should receive auth success
-            message = await websocket.recv()
-            data = json.loads(message)
+            message = await _recv(websocket)
+            data = loads_message(message)
             
             assert data['type'] == 'auth_response'
             assert data['success'] is True
             assert 'token' in data
             
             # Now should receive welcome message
-            message = await websocket.recv()
-            data = json.loads(message)
+            message = await _recv(websocket)
+            data = loads_message(message)
             assert data['type'] == 'welcome'
-        
+    finally:
         server.close()
         await server.wait_closed()
-        
-    finally:
-        # Clean up env vars
-        os.environ['AUTH_ENABLED'] = 'false'
 
 
-@pytest.mark.asyncio
 async def test_multiple_clients(websocket_server):
     """Test multiple concurrent WebSocket connections."""
-    clients = []
+    # Connect 3 clients, overlapping the handshakes
+    clients = await asyncio.gather(
+        *(websockets.connect(websocket_server) for _ in range(3))
+    )
     
-    # Connect 3 clients
-    for i in range(3):
-        client = await websockets.connect(websocket_server)
-        clients.append(client)
-        
-        # Each should receive welcome message
-        message = await client.recv()
-        data = json.loads(message)
+    # Each should receive welcome message, followed by the current status
+    welcomes = await asyncio.gather(*(_recv(client) for client in clients))
+    for message in welcomes:
+        data = loads_message(message)
         assert data['type'] == 'welcome'
+    await asyncio.gather(*(_recv(client) for client in clients))
     
-    # All clients should be able to send messages
-    for i, client in enumerate(clients):
-        await client.send(json.dumps({'type': 'get_config'}))
-        message = await client.recv()
-        data = json.loads(message)
+    # All clients should be able to send messages at the same time
+    await asyncio.gather(*(client.send(_GET_CONFIG_REQ) for client in clients))
+    responses = await asyncio.gather(*(_recv(client) for client in clients))
+    for message in responses:
+        data = loads_message(message)
         assert data['type'] == 'config'
     
     # Close all clients
-    for client in clients:
-        await client.close()
+    await asyncio.gather(*(client.close() for client in clients))
 
 
 if __name__ == '__main__':
@@ -3,69 +3,101 @@ Unit tests for geometry helper functions
 """
 import pytest
 import math
-from backend.utils.geometry import haversine_distance, bearing_between, elevation_angle, is_plane_approaching, calculate_eta
+from backend.utils.geometry import NUMBA_AVAILABLE, haversine_distance, equirectangular_distance, bearing_between, bearings_from_origin, elevation_angle, is_plane_approaching, calculate_eta
+
+
+@pytest.fixture(scope="module", autouse=True)
+def warm_geometry_jit():
+    """Trigger JIT compilation once (when numba is installed) before the tests run"""
+    haversine_distance(0.0, 0.0, 0.0, 1.0)
+    equirectangular_distance(0.0, 0.0, 0.0, 1.0)
+    bearing_between(0.0, 0.0, 0.0, 1.0)
+    bearings_from_origin(0.0, 1.0, 0.0, 0.0, 1.0)
+    elevation_angle(1.0, 1000.0)
+    is_plane_approaching(0.0, 180.0, 180.0)
 
 
 class TestHaversineDistance:
     """Test cases for haversine_distance function"""
     
-    def test_same_location(self):
-        """Distance between same points should be 0"""
-        distance = haversine_distance(51.5074, -0.1278, 51.5074, -0.1278)
-        assert distance == 0
-    
-    def test_known_distance(self):
-        """Test with known distance between London and Paris (approx 344 km)"""
-        # London: 51.5074° N, 0.1278° W
-        # Paris: 48.8566° N, 2.3522° E
-        distance = haversine_distance(51.5074, -0.1278, 48.8566, 2.3522)
-        assert 340 < distance < 350  # Allow for small calculation differences
-    
-    def test_equator_distance(self):
-        """Test distance along equator (should be approx 111 km per degree)"""
-        distance = haversine_distance(0, 0, 0, 1)
-        assert 110 < distance < 112
+    @pytest.mark.parametrize("lat1,lon1,lat2,lon2,expected_low,expected_high", [
+        # Same point should be 0
+        pytest.param(51.5074, -0.1278, 51.5074, -0.1278, 0, 0, id="same_location"),
+        # London -> Paris is approx 344 km
+        pytest.param(51.5074, -0.1278, 48.8566, 2.3522, 340, 350, id="london_paris"),
+        # Approx 111 km per degree along the equator
+        pytest.param(0, 0, 0, 1, 110, 112, id="equator_degree"),
+        # North to South pole is approx 20,000 km
+        pytest.param(90, 0, -90, 0, 19900, 20100, id="pole_to_pole"),
+        # Antipodal points on the equator are half the circumference apart
+        pytest.param(0, 0, 0, 180, 20000, 20030, id="antipodal"),
+    ])
+    def test_distance(self, lat1, lon1, lat2, lon2, expected_low, expected_high):
+        """Distances fall within the expected range"""
+        distance = haversine_distance(lat1, lon1, lat2, lon2)
+        assert expected_low <= distance <= expected_high
+
+
+class TestEquirectangularDistance:
+    """Test cases for equirectangular_distance function"""
     
-    def test_pole_to_pole(self):
-        """Test distance from North to South pole (approx 20,000 km)"""
-        distance = haversine_distance(90, 0, -90, 0)
-        assert 19900 < distance < 20100
+    @pytest.mark.parametrize("lat2,lon2", [
+        pytest.param(51.5074, -0.1278, id="same_location"),
+        pytest.param(51.8, -0.1278, id="north_30km"),
+        pytest.param(51.5074, 0.5, id="east_45km"),
+        pytest.param(51.0, -1.0, id="southwest_80km"),
+        pytest.param(52.4862, -1.8904, id="london_birmingham"),
+    ])
+    def test_matches_haversine_at_short_range(self, lat2, lon2):
+        """Short-range distances agree with haversine to within 0.1%"""
+        expected = haversine_distance(51.5074, -0.1278, lat2, lon2)
+        distance = equirectangular_distance(51.5074, -0.1278, lat2, lon2)
+        assert distance == pytest.approx(expected, rel=1e-3, abs=1e-9)
 
 
 class TestBearingBetween:
     """Test cases for bearing_between function"""
     
-    def test_north_bearing(self):
-        """Bearing should be 0° when destination is due north"""
-        bearing = bearing_between(0, 0, 1, 0)
-        assert -1 < bearing < 1  # Allow for floating point errors
-    
-    def test_east_bearing(self):
-        """Bearing should be 90° when destination is due east"""
-        bearing = bearing_between(0, 0, 0, 1)
-        assert 89 < bearing < 91
-    
-    def test_south_bearing(self):
-        """Bearing should be 180° when destination is due south"""
-        bearing = bearing_between(1, 0, 0, 0)
-        assert 179 < bearing < 181
+    @pytest.mark.parametrize("lat1,lon1,lat2,lon2,expected", [
+        pytest.param(0, 0, 1, 0, 0, id="north"),
+        pytest.param(0, 0, 0, 1, 90, id="east"),
+        pytest.param(1, 0, 0, 0, 180, id="south"),
+        pytest.param(0, 1, 0, 0, 270, id="west"),
+    ])
+    def test_cardinal_bearing(self, lat1, lon1, lat2, lon2, expected):
+        """Bearing to a due north/east/south/west destination"""
+        bearing = bearing_between(lat1, lon1, lat2, lon2)
+        assert abs(bearing - expected) < 1  # Allow for floating point errors
     
-    def test_west_bearing(self):
-        """Bearing should be 270° when destination is due west"""
-        bearing = bearing_between(0, 1, 0, 0)
-        assert 269 < bearing < 271
-    
-    def test_bearing_range(self):
+    @pytest.mark.parametrize("lat1,lon1,lat2,lon2", [
+        (51.5, -0.1, 48.8, 2.3),
+        (40.7, -74.0, 51.5, -0.1),
+        (-33.9, 18.4, 55.7, 12.6),
+        (35.7, 139.7, -37.8, 144.9)
+    ])
+    def test_bearing_range(self, lat1, lon1, lat2, lon2):
         """Bearing should always be between 0 and 360 degrees"""
-        test_coords = [
-            (51.5, -0.1, 48.8, 2.3),
-            (40.7, -74.0, 51.5, -0.1),
-            (-33.9, 18.4, 55.7, 12.6),
-            (35.7, 139.7, -37.8, 144.9)
-        ]
-        for lat1, lon1, lat2, lon2 in test_coords:
-            bearing = bearing_between(lat1, lon1, lat2, lon2)
-            assert 0 <= bearing < 360
+        bearing = bearing_between(lat1, lon1, lat2, lon2)
+        assert 0 <= bearing < 360
+
+
+class TestBearingsFromOrigin:
+    """Test cases for bearings_from_origin function"""
+    
+    @pytest.mark.parametrize("lat1,lon1,lat2,lon2", [
+        pytest.param(51.5074, -0.1278, 51.8, -0.1278, id="north"),
+        pytest.param(51.5074, -0.1278, 51.2, 0.4, id="southeast"),
+        pytest.param(51.5074, -0.1278, 51.6, -0.9, id="northwest"),
+        pytest.param(0, 0, 0, 1, id="equator_east"),
+    ])
+    def test_matches_bearing_between(self, lat1, lon1, lat2, lon2):
+        """Both directions agree with bearing_between"""
+        lat1_rad = math.radians(lat1)
+        forward, reverse = bearings_from_origin(
+            math.sin(lat1_rad), math.cos(lat1_rad), lon1, lat2, lon2
+        )
+        assert forward == pytest.approx(bearing_between(lat1, lon1, lat2, lon2), abs=1e-9)
+        assert reverse == pytest.approx(bearing_between(lat2, lon2, lat1, lon1), abs=1e-9)
 
 
 class TestElevationAngle:
@@ -242,5 +274,22 @@ class TestCalculateETA:
         assert 0 < eta < 400  # Still some time needed even at high elevation
 
 
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba is not installed")
+class TestCompiledKernels:
+    """Check that the parametrized cases above ran against numba-compiled kernels"""
+    
+    @pytest.mark.parametrize("kernel", [
+        haversine_distance,
+        equirectangular_distance,
+        bearing_between,
+        bearings_from_origin,
+        elevation_angle,
+        is_plane_approaching,
+    ], ids=lambda kernel: kernel.__name__)
+    def test_kernel_is_compiled(self, kernel):
+        """Each kernel is a numba dispatcher with a compiled float signature"""
+        assert kernel.signatures
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
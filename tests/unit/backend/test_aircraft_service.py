@@ -4,11 +4,6 @@ Unit tests for aircraft service
 
 import unittest
 
-# Import the functions we're testing
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
-
 from backend.aircraft_service import AircraftService
 from backend.models import AircraftData, VisibilityStatus
 
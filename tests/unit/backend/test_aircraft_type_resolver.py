@@ -2,15 +2,34 @@
 Tests for aircraft type resolver.
 """
 
+import pytest
 from unittest.mock import patch
 
-from backend.aircraft_type_resolver import (
+from backend.database import db
+from backend.core import aircraft_type_resolver as resolver
+from backend.core.aircraft_type_resolver import (
     simplify_aircraft_type,
     resolve_aircraft_type,
-    get_aircraft_info_with_fallbacks
+    resolve_aircraft_types,
+    get_aircraft_info_with_fallbacks,
+    clear_resolved_type_cache
 )
 
 
+@pytest.fixture(autouse=True)
+def fresh_resolved_type_cache():
+    """Start every test with an empty resolved-type cache."""
+    clear_resolved_type_cache()
+    yield
+    clear_resolved_type_cache()
+
+
+@pytest.fixture(autouse=True)
+def temp_db_path(tmp_path, monkeypatch):
+    """Keep unidentified-aircraft logging out of the real database file."""
+    monkeypatch.setattr(db, 'DB_PATH', str(tmp_path / 'test_aircraft.db'))
+
+
 class TestSimplifyAircraftType:
     """Test aircraft type simplification."""
     
@@ -47,6 +66,31 @@ class TestSimplifyAircraftType:
         assert simplify_aircraft_type('Beechcraft', 'King Air') == 'Beechcraft Small Plane'
         assert simplify_aircraft_type('Gulfstream', 'G650') == 'Gulfstream Private Jet'
     
+    @pytest.mark.parametrize('manufacturer, type_name, before, after', [
+        ('Cessna', 'Citation X', 'Cessna Small Plane', 'Cessna Citation Jet'),
+        ('CESSNA', 'Citation', 'Cessna Small Plane', 'Cessna Citation Jet'),
+        ('Cessna', '525 Citation CJ1', 'Cessna Small Plane', 'Cessna Citation Jet'),
+        ('Cessna', '172 Skyhawk', 'Cessna Small Plane', 'Cessna Small Plane'),
+        ('', 'Citation Mustang', 'Cessna Citation Jet', 'Cessna Citation Jet'),
+    ])
+    def test_citation_matches_before_cessna(self, manufacturer, type_name, before, after):
+        """Test that Cessna Citations are no longer reported as small planes."""
+        # The pattern table used to list Citation after Cessna
+        patterns = [entry for entry in resolver._TYPE_PATTERNS if entry[0] != 'CITATION']
+        patterns.append(('CITATION', 'Cessna Citation Jet'))
+        with patch.object(resolver, '_TYPE_PATTERNS', tuple(patterns)):
+            assert simplify_aircraft_type.__wrapped__(manufacturer, type_name) == before
+        
+        assert simplify_aircraft_type(manufacturer, type_name) == after
+    
+    def test_manufacturer_fallbacks(self):
+        """Test manufacturer fallbacks for exact and long-form names."""
+        assert simplify_aircraft_type('Boeing', 'Unknown') == 'Boeing Unknown'
+        assert simplify_aircraft_type('The Boeing Company', 'X-1') == 'Boeing X-1'
+        assert simplify_aircraft_type('Airbus Industrie', '') == 'Airbus Aircraft'
+        assert simplify_aircraft_type('Piper Aircraft Inc', 'Cub') == 'Piper Small Plane'
+        assert simplify_aircraft_type('Beech', 'Bonanza') == 'Beechcraft Small Plane'
+    
     def test_generic_handling(self):
         """Test generic manufacturer and type handling."""
         assert simplify_aircraft_type('Unknown Mfr', 'Some Type') == 'Unknown Mfr Some Type'
@@ -59,7 +103,7 @@ class TestSimplifyAircraftType:
 class TestResolveAircraftType:
     """Test aircraft type resolution with fallbacks."""
     
-    @patch('backend.aircraft_type_resolver.get_aircraft_from_cache')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
     def test_cache_hit(self, mock_get_cache):
         """Test resolution when type is in cache."""
         mock_get_cache.return_value = {
@@ -72,7 +116,7 @@ class TestResolveAircraftType:
         assert result == 'Boeing 737-800'
         mock_get_cache.assert_called_once_with('abc123')
     
-    @patch('backend.aircraft_type_resolver.get_aircraft_from_cache')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
     def test_cache_skip_placeholder(self, mock_get_cache):
         """Test that placeholder types are skipped."""
         mock_get_cache.return_value = {
@@ -81,17 +125,17 @@ class TestResolveAircraftType:
             'image_url': ''
         }
         
-        with patch('backend.aircraft_type_resolver.fetch_aircraft_details_from_hexdb') as mock_hexdb:
+        with patch('backend.core.aircraft_type_resolver.fetch_aircraft_details_from_hexdb') as mock_hexdb:
             mock_hexdb.return_value = None
-            with patch('backend.aircraft_type_resolver.get_aircraft_type_string') as mock_planespotters:
+            with patch('backend.core.aircraft_type_resolver.get_aircraft_type_string') as mock_planespotters:
                 mock_planespotters.return_value = None
                 
                 result = resolve_aircraft_type('abc123')
                 assert result == 'Unknown Aircraft'
     
-    @patch('backend.aircraft_type_resolver.get_aircraft_from_cache')
-    @patch('backend.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
-    @patch('backend.aircraft_type_resolver.save_aircraft_to_cache')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
+    @patch('backend.core.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
+    @patch('backend.core.aircraft_type_resolver.save_aircraft_to_cache')
     def test_hexdb_fallback(self, mock_save_cache, mock_hexdb, mock_get_cache):
         """Test fallback to hexdb when cache misses."""
         mock_get_cache.return_value = None
@@ -109,10 +153,10 @@ class TestResolveAircraftType:
         assert saved_data['icao24'] == 'def456'
         assert saved_data['type'] == 'Airbus A320'
     
-    @patch('backend.aircraft_type_resolver.get_aircraft_from_cache')
-    @patch('backend.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
-    @patch('backend.aircraft_type_resolver.get_aircraft_type_string')
-    @patch('backend.aircraft_type_resolver.save_aircraft_to_cache')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
+    @patch('backend.core.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_type_string')
+    @patch('backend.core.aircraft_type_resolver.save_aircraft_to_cache')
     def test_planespotters_fallback(self, mock_save_cache, mock_planespotters, mock_hexdb, mock_get_cache):
         """Test fallback to Planespotters when hexdb fails."""
         mock_get_cache.return_value = None
@@ -128,9 +172,9 @@ class TestResolveAircraftType:
         assert saved_data['icao24'] == 'ghi789'
         assert saved_data['type'] == 'Boeing 777'
     
-    @patch('backend.aircraft_type_resolver.get_aircraft_from_cache')
-    @patch('backend.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
-    @patch('backend.aircraft_type_resolver.get_aircraft_type_string')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
+    @patch('backend.core.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_type_string')
     def test_all_fallbacks_fail(self, mock_planespotters, mock_hexdb, mock_get_cache):
         """Test when all data sources fail."""
         mock_get_cache.return_value = None
@@ -140,14 +184,27 @@ class TestResolveAircraftType:
         result = resolve_aircraft_type('xyz999')
         assert result == 'Unknown Aircraft'
     
-    @patch('backend.aircraft_type_resolver.get_aircraft_from_cache')
-    @patch('backend.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
+    def test_recent_result_reused(self, mock_get_cache):
+        """Test that a recently resolved type skips the lookups."""
+        mock_get_cache.return_value = {
+            'icao24': 'abc123',
+            'type': 'Boeing 737-800',
+            'image_url': ''
+        }
+        
+        assert resolve_aircraft_type('abc123') == 'Boeing 737-800'
+        assert resolve_aircraft_type('abc123') == 'Boeing 737-800'
+        mock_get_cache.assert_called_once_with('abc123')
+    
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
+    @patch('backend.core.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
     def test_hexdb_error_handling(self, mock_hexdb, mock_get_cache):
         """Test error handling when hexdb throws exception."""
         mock_get_cache.return_value = None
         mock_hexdb.side_effect = Exception("Database error")
         
-        with patch('backend.aircraft_type_resolver.get_aircraft_type_string') as mock_planespotters:
+        with patch('backend.core.aircraft_type_resolver.get_aircraft_type_string') as mock_planespotters:
             mock_planespotters.return_value = 'Cessna Citation X'
             
             result = resolve_aircraft_type('error123')
@@ -157,11 +214,81 @@ class TestResolveAircraftType:
             mock_planespotters.assert_called_once_with('error123')
 
 
+class TestResolveAircraftTypes:
+    """Test batch aircraft type resolution."""
+    
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_batch_from_cache')
+    def test_single_cache_query(self, mock_get_batch):
+        """Test that cached types for a batch come from one query."""
+        mock_get_batch.return_value = {
+            'abc123': {'icao24': 'abc123', 'type': 'Boeing 737-800', 'image_url': ''},
+            'def456': {'icao24': 'def456', 'type': 'Airbus A320', 'image_url': ''}
+        }
+        
+        result = resolve_aircraft_types(['abc123', 'def456'])
+        assert result == {'abc123': 'Boeing 737-800', 'def456': 'Airbus A320'}
+        mock_get_batch.assert_called_once_with(['abc123', 'def456'])
+    
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_batch_from_cache')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_type_string')
+    @patch('backend.core.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
+    @patch('backend.core.aircraft_type_resolver.save_aircraft_to_cache')
+    def test_misses_fall_back(self, mock_save_cache, mock_hexdb, mock_planespotters, mock_get_batch):
+        """Test that aircraft missing from the cache use the fallbacks."""
+        mock_get_batch.return_value = {
+            'abc123': {'icao24': 'abc123', 'type': 'Boeing 737-800', 'image_url': ''}
+        }
+        mock_hexdb.return_value = {'Manufacturer': 'Airbus', 'Type': 'A320-214'}
+        
+        result = resolve_aircraft_types(['abc123', 'def456'])
+        assert result == {'abc123': 'Boeing 737-800', 'def456': 'Airbus A320'}
+        mock_hexdb.assert_called_once_with('def456')
+        mock_planespotters.assert_not_called()
+    
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_batch_from_cache')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_type_string')
+    @patch('backend.core.aircraft_type_resolver.fetch_aircraft_details_from_hexdb')
+    @patch('backend.core.aircraft_type_resolver.save_aircraft_to_cache')
+    def test_concurrent_fallbacks(self, mock_save_cache, mock_hexdb, mock_planespotters, mock_get_batch):
+        """Test that several misses each get their own fallback result."""
+        mock_get_batch.return_value = {}
+        hexdb_data = {
+            'abc123': {'Manufacturer': 'Boeing', 'Type': '787-9'},
+            'def456': {'Manufacturer': 'Airbus', 'Type': 'A320-214'},
+            'ghi789': {'Manufacturer': 'Embraer', 'Type': 'E190'}
+        }
+        mock_hexdb.side_effect = hexdb_data.get
+        
+        result = resolve_aircraft_types(list(hexdb_data))
+        assert result == {
+            'abc123': 'Boeing 787 Dreamliner',
+            'def456': 'Airbus A320',
+            'ghi789': 'Embraer E190'
+        }
+        assert mock_hexdb.call_count == 3
+        mock_planespotters.assert_not_called()
+    
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_batch_from_cache')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
+    def test_recent_results_skip_query(self, mock_get_cache, mock_get_batch):
+        """Test that recently resolved aircraft are not queried again."""
+        mock_get_cache.return_value = {
+            'icao24': 'abc123',
+            'type': 'Boeing 737-800',
+            'image_url': ''
+        }
+        resolve_aircraft_type('abc123')
+        
+        result = resolve_aircraft_types(['abc123'])
+        assert result == {'abc123': 'Boeing 737-800'}
+        mock_get_batch.assert_not_called()
+
+
 class TestGetAircraftInfoWithFallbacks:
     """Test comprehensive aircraft info retrieval."""
     
-    @patch('backend.aircraft_type_resolver.resolve_aircraft_type')
-    @patch('backend.aircraft_type_resolver.get_aircraft_from_cache')
+    @patch('backend.core.aircraft_type_resolver.resolve_aircraft_type')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
     def test_with_cached_data(self, mock_get_cache, mock_resolve):
         """Test getting info when cache has data."""
         mock_resolve.return_value = 'Boeing 737'
@@ -179,8 +306,8 @@ class TestGetAircraftInfoWithFallbacks:
         assert result['image_url'] == 'https://example.com/737.jpg'
         assert result['last_updated'] == '2024-01-01 12:00:00'
     
-    @patch('backend.aircraft_type_resolver.resolve_aircraft_type')
-    @patch('backend.aircraft_type_resolver.get_aircraft_from_cache')
+    @patch('backend.core.aircraft_type_resolver.resolve_aircraft_type')
+    @patch('backend.core.aircraft_type_resolver.get_aircraft_from_cache')
     def test_without_cached_data(self, mock_get_cache, mock_resolve):
         """Test getting info when cache is empty."""
         mock_resolve.return_value = 'Airbus A320'
@@ -7,7 +7,13 @@ import threading
 from unittest.mock import patch, MagicMock
 import requests
 
-from backend.api_pool import APIConnectionPool, get_global_pool, close_global_pool
+from backend.api.api_pool import (
+    APIConnectionPool,
+    get_global_pool,
+    close_global_pool,
+    _split_url,
+    _split_base_url
+)
 
 
 class TestAPIConnectionPool:
@@ -77,6 +83,18 @@ class TestAPIConnectionPool:
         assert session1 is not session2
         assert len(self.pool._sessions) == 2
     
+    def test_split_url_caches_per_host(self):
+        """Test that URLs differing only in path share one parsed host entry."""
+        _split_base_url.cache_clear()
+        
+        for icao24 in ('abc123', 'def456', 'ghi789'):
+            base_url, hostname = _split_url(f"https://hexdb.io/api/v1/aircraft/{icao24}?x=1")
+            assert base_url == "https://hexdb.io"
+            assert hostname == "hexdb.io"
+        
+        assert _split_url("http://localhost:8000") == ("http://localhost:8000", "localhost:8000")
+        assert _split_base_url.cache_info().currsize == 2
+    
     def test_rate_limiting(self):
         """Test rate limiting enforcement."""
         self.pool.set_rate_limit("example.com", 0.5)  # 500ms between requests
@@ -129,6 +147,7 @@ class TestAPIConnectionPool:
     def test_get_method(self, mock_request):
         """Test the GET method."""
         mock_response = MagicMock()
+        mock_response.elapsed.total_seconds.return_value = 0.123
         mock_request.return_value = mock_response
         
         response = self.pool.get('https://example.com/api/test', params={'q': 'test'})
@@ -145,6 +164,7 @@ class TestAPIConnectionPool:
     def test_post_method(self, mock_request):
         """Test the POST method."""
         mock_response = MagicMock()
+        mock_response.elapsed.total_seconds.return_value = 0.123
         mock_request.return_value = mock_response
         
         response = self.pool.post('https://example.com/api/test', json={'data': 'test'})
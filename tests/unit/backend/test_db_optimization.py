@@ -2,59 +2,132 @@
 Tests for database optimization.
 """
 
+import itertools
 import sqlite3
 import tempfile
-import os
 
-from backend.optimize_db_indexes import DatabaseOptimizer
-from backend.db import AircraftDatabase
+import pytest
+
+from backend.database.optimize_db_indexes import DatabaseOptimizer
+from backend.database.db import AircraftDatabase
+
+
+AIRCRAFT_INDEX_NAMES = {
+    'idx_aircraft_last_updated',
+    'idx_aircraft_type_updated'
+}
+
+LOGBOOK_INDEX_NAMES = {
+    'idx_logbook_first_spotted',
+    'idx_logbook_last_spotted',
+    'idx_logbook_sighting_count',
+    'idx_logbook_spotted_type'
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def brum_test_mode():
+    """Open every database in this module with the throwaway-DB pragmas."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('BRUM_TEST_MODE', '1')
+        yield
+
+
+@pytest.fixture(scope="class")
+def readonly_db_path(request):
+    """One copy of the template shared by the tests that only read it."""
+    db_path = f"{request.cls._temp_dir.name}/readonly.db"
+    request.cls._copy_template(db_path)
+    return db_path
+
+
+@pytest.fixture(scope="class")
+def optimized_index_names(request):
+    """Run the full optimization once and collect the resulting index names."""
+    db_path = f"{request.cls._temp_dir.name}/optimized.db"
+    request.cls._copy_template(db_path)
+    
+    # Should not raise any exceptions
+    DatabaseOptimizer(db_path).optimize()
+    
+    conn = sqlite3.connect(db_path)
+    index_names = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    )}
+    conn.close()
+    return index_names
 
 
 class TestDatabaseOptimization:
     """Test database optimization functionality."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        # Create a temporary database
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.db_path = self.temp_db.name
-        self.temp_db.close()
-        
-        # Initialize database with test data
-        self._setup_test_data()
-    
-    def teardown_method(self):
-        """Clean up after tests."""
-        if os.path.exists(self.db_path):
-            os.unlink(self.db_path)
-    
-    def _setup_test_data(self):
-        """Create test database with sample data."""
-        db = AircraftDatabase(self.db_path)
-        
-        # Add aircraft data
-        for i in range(100):
-            db.save_aircraft_to_cache({
-                'icao24': f'test{i:03d}',
-                'image_url': f'https://example.com/plane{i}.jpg',
-                'type': f'B73{i%10}'
-            })
-        
-        # Add logbook data
+    @classmethod
+    def setup_class(cls):
+        """Seed an in-memory template database once for the whole class."""
+        cls.template_db = cls._setup_test_data(':memory:')
+        
+        # Test databases live in one directory that is removed with the class
+        cls._temp_dir = tempfile.TemporaryDirectory()
+        cls._db_counter = itertools.count()
+    
+    @classmethod
+    def teardown_class(cls):
+        """Drop the template database and the test databases."""
+        cls.template_db.close()
+        cls._temp_dir.cleanup()
+    
+    @classmethod
+    def _copy_template(cls, db_path):
+        """Write a copy of the seeded template database to db_path."""
+        file_conn = sqlite3.connect(db_path)
+        cls.template_db.connection.backup(file_conn)
+        file_conn.close()
+    
+    @pytest.fixture
+    def db_path(self):
+        """A fresh copy of the template for a test that modifies it."""
+        db_path = f"{self._temp_dir.name}/test_{next(self._db_counter)}.db"
+        self._copy_template(db_path)
+        return db_path
+    
+    @staticmethod
+    def _setup_test_data(db_path):
+        """Create test database with sample data and return it open."""
+        db = AircraftDatabase(db_path)
+        
+        aircraft_rows = [
+            (f'test{i:03d}', f'https://example.com/plane{i}.jpg', f'B73{i%10}')
+            for i in range(100)
+        ]
+        
+        # Seed the aircraft in one transaction; row-by-row helpers would
+        # commit once per row
+        with db.connection:
+            db.connection.executemany(
+                "INSERT INTO aircraft (icao24, image_url, type) VALUES (?, ?, ?)",
+                aircraft_rows
+            )
+        
+        # 50 sightings spread over 10 types, so each type is spotted 5 times.
+        # These go through add_to_logbook so the seed matches its upsert.
         for i in range(50):
-            db.add_to_logbook(f'Boeing 73{i%10}', f'https://example.com/boeing{i}.jpg')
+            db.add_to_logbook(
+                f'Boeing 73{i%10}',
+                f'https://example.com/boeing{i}.jpg',
+                spotted_at=f'2024-01-01 00:{i:02d}:00'
+            )
         
-        db.close()
+        return db
     
-    def test_optimizer_initialization(self):
+    def test_optimizer_initialization(self, readonly_db_path):
         """Test optimizer initialization."""
-        optimizer = DatabaseOptimizer(self.db_path)
-        assert optimizer.db_path == self.db_path
+        optimizer = DatabaseOptimizer(readonly_db_path)
+        assert optimizer.db_path == readonly_db_path
         assert optimizer.connection is None
     
-    def test_connect_and_close(self):
+    def test_connect_and_close(self, readonly_db_path):
         """Test database connection management."""
-        optimizer = DatabaseOptimizer(self.db_path)
+        optimizer = DatabaseOptimizer(readonly_db_path)
         
         # Test connect
         optimizer.connect()
@@ -66,9 +139,9 @@ class TestDatabaseOptimization:
         # Connection should be closed but not None
         assert optimizer.connection is not None
     
-    def test_analyze_current_indexes(self):
+    def test_analyze_current_indexes(self, readonly_db_path):
         """Test analyzing current indexes."""
-        optimizer = DatabaseOptimizer(self.db_path)
+        optimizer = DatabaseOptimizer(readonly_db_path)
         optimizer.connect()
         
         indexes = optimizer.analyze_current_indexes()
@@ -83,9 +156,17 @@ class TestDatabaseOptimization:
         
         optimizer.close()
     
-    def test_get_table_info(self):
+    def test_seeded_logbook_shape(self, readonly_db_path):
+        """Test that the seed holds 10 aircraft types spotted 5 times each."""
+        conn = sqlite3.connect(readonly_db_path)
+        counts = dict(conn.execute("SELECT aircraft_type, sighting_count FROM logbook"))
+        conn.close()
+        
+        assert counts == {f'Boeing 73{i}': 5 for i in range(10)}
+    
+    def test_get_table_info(self, readonly_db_path):
         """Test getting table information."""
-        optimizer = DatabaseOptimizer(self.db_path)
+        optimizer = DatabaseOptimizer(readonly_db_path)
         optimizer.connect()
         
         # Test aircraft table
@@ -105,45 +186,77 @@ class TestDatabaseOptimization:
         
         optimizer.close()
     
-    def test_create_aircraft_indexes(self):
+    def test_get_table_info_is_cached(self, readonly_db_path):
+        """Test that repeated lookups reuse the first PRAGMA result."""
+        optimizer = DatabaseOptimizer(readonly_db_path)
+        optimizer.connect()
+        
+        aircraft_info = optimizer.get_table_info('aircraft')
+        optimizer.close()
+        
+        # The connection is gone, so this can only come from the cache
+        assert optimizer.get_table_info('aircraft') is aircraft_info
+    
+    def test_create_aircraft_indexes(self, db_path):
         """Test creating aircraft table indexes."""
-        optimizer = DatabaseOptimizer(self.db_path)
+        optimizer = DatabaseOptimizer(db_path)
         optimizer.connect()
         
         # Create indexes
         optimizer.create_aircraft_indexes()
         
         # Verify indexes were created
-        indexes = optimizer.analyze_current_indexes()
-        index_names = [idx[0] for idx in indexes]
-        
-        assert 'idx_aircraft_last_updated' in index_names
-        assert 'idx_aircraft_type_updated' in index_names
+        index_names = {name for name, _ in optimizer.analyze_current_indexes()}
+        assert AIRCRAFT_INDEX_NAMES <= index_names
         
         optimizer.close()
     
-    def test_create_logbook_indexes(self):
+    def test_create_logbook_indexes(self, db_path):
         """Test creating logbook table indexes."""
-        optimizer = DatabaseOptimizer(self.db_path)
+        optimizer = DatabaseOptimizer(db_path)
         optimizer.connect()
         
         # Create indexes
         optimizer.create_logbook_indexes()
         
         # Verify indexes were created
-        indexes = optimizer.analyze_current_indexes()
-        index_names = [idx[0] for idx in indexes]
+        index_names = {name for name, _ in optimizer.analyze_current_indexes()}
+        assert LOGBOOK_INDEX_NAMES <= index_names
+        
+        optimizer.close()
+    
+    def test_create_all_indexes(self, db_path):
+        """Test creating every table's indexes in one transaction."""
+        optimizer = DatabaseOptimizer(db_path)
+        optimizer.connect()
+        
+        optimizer.create_all_indexes()
         
-        assert 'idx_logbook_first_spotted' in index_names
-        assert 'idx_logbook_last_spotted' in index_names
-        assert 'idx_logbook_sighting_count' in index_names
-        assert 'idx_logbook_spotted_type' in index_names
+        index_names = {name for name, _ in optimizer.analyze_current_indexes()}
+        assert AIRCRAFT_INDEX_NAMES | LOGBOOK_INDEX_NAMES <= index_names
         
         optimizer.close()
     
-    def test_get_database_stats(self):
+    def test_create_all_indexes_rolls_back_on_error(self, db_path):
+        """Test that a failing index leaves no partial indexes or open transaction."""
+        optimizer = DatabaseOptimizer(db_path)
+        optimizer.connect()
+        optimizer.connection.execute("DROP TABLE logbook")
+        
+        with pytest.raises(sqlite3.OperationalError):
+            optimizer.create_all_indexes()
+        
+        assert not optimizer.connection.in_transaction
+        # The aircraft indexes created before the failure are rolled back too
+        # (idx_aircraft_last_updated already exists from the schema itself)
+        index_names = {name for name, _ in optimizer.analyze_current_indexes()}
+        assert 'idx_aircraft_type_updated' not in index_names
+        
+        optimizer.close()
+    
+    def test_get_database_stats(self, readonly_db_path):
         """Test getting database statistics."""
-        optimizer = DatabaseOptimizer(self.db_path)
+        optimizer = DatabaseOptimizer(readonly_db_path)
         optimizer.connect()
         
         stats = optimizer.get_database_stats()
@@ -154,24 +267,28 @@ class TestDatabaseOptimization:
         assert 'index_count' in stats
         
         assert stats['aircraft_rows'] == 100
-        assert stats['logbook_rows'] == 50
+        assert stats['logbook_rows'] == 10
         assert stats['database_size_mb'] > 0
         
         optimizer.close()
     
-    def test_analyze_tables(self):
+    def test_analyze_tables(self, db_path):
         """Test analyzing tables."""
-        optimizer = DatabaseOptimizer(self.db_path)
+        optimizer = DatabaseOptimizer(db_path)
         optimizer.connect()
         
-        # Should not raise any exceptions
         optimizer.analyze_tables()
         
+        # Planner statistics were gathered
+        stat_rows = optimizer.connection.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]
+        assert stat_rows > 0
+        
         optimizer.close()
     
-    def test_vacuum_database(self):
+    @pytest.mark.slow
+    def test_vacuum_database(self, db_path):
         """Test vacuuming database."""
-        optimizer = DatabaseOptimizer(self.db_path)
+        optimizer = DatabaseOptimizer(db_path)
         optimizer.connect()
         
         # Get size before vacuum
@@ -186,59 +303,57 @@ class TestDatabaseOptimization:
         
         optimizer.close()
     
-    def test_full_optimization_process(self):
-        """Test the complete optimization process."""
-        optimizer = DatabaseOptimizer(self.db_path)
-        
-        # Should not raise any exceptions
-        optimizer.optimize()
+    @pytest.mark.parametrize("index_name", sorted(AIRCRAFT_INDEX_NAMES | LOGBOOK_INDEX_NAMES))
+    def test_full_optimization_process(self, optimized_index_names, index_name):
+        """Test that the complete optimization process creates every index."""
+        assert index_name in optimized_index_names
+    
+    def test_optimize_gathers_statistics(self, db_path):
+        """Test that optimize() leaves planner statistics for the new indexes."""
+        DatabaseOptimizer(db_path).optimize(skip_vacuum=True)
         
-        # Verify indexes were created
-        optimizer.connect()
-        indexes = optimizer.analyze_current_indexes()
-        index_names = [idx[0] for idx in indexes]
-        
-        # Should have all the expected indexes
-        expected_indexes = [
-            'idx_aircraft_last_updated',
-            'idx_aircraft_type_updated',
-            'idx_logbook_first_spotted',
-            'idx_logbook_last_spotted',
-            'idx_logbook_sighting_count',
-            'idx_logbook_spotted_type'
-        ]
+        conn = sqlite3.connect(db_path)
+        analyzed_indexes = {row[0] for row in conn.execute("SELECT idx FROM sqlite_stat1")}
+        conn.close()
         
-        for expected in expected_indexes:
-            assert expected in index_names
+        assert LOGBOOK_INDEX_NAMES <= analyzed_indexes
+    
+    def test_optimize_skip_vacuum(self, db_path):
+        """Test that optimize() can leave out the VACUUM step."""
+        optimizer = DatabaseOptimizer(db_path)
+        optimizer.vacuum_database = lambda: pytest.fail("VACUUM should be skipped")
         
-        optimizer.close()
+        optimizer.optimize(skip_vacuum=True)
     
-    def test_query_performance_improvement(self):
+    def test_query_performance_improvement(self, db_path):
         """Test that indexes improve query performance."""
-        # Test without indexes
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        query = "EXPLAIN QUERY PLAN SELECT * FROM logbook ORDER BY first_spotted DESC"
+        conn = sqlite3.connect(db_path, isolation_level=None)
         
-        # Measure query without indexes
-        cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM logbook ORDER BY first_spotted DESC")
-        plan_before = cursor.fetchall()
+        # Query plan without indexes
+        plan_before = conn.execute(query).fetchall()
+        assert 'idx_logbook_first_spotted' not in str(plan_before)
         
-        conn.close()
-        
-        # Optimize database
-        optimizer = DatabaseOptimizer(self.db_path)
-        optimizer.optimize()
-        
-        # Test with indexes
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Measure query with indexes
-        cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM logbook ORDER BY first_spotted DESC")
-        plan_after = cursor.fetchall()
+        # Optimize through the same connection, which stays open afterwards
+        DatabaseOptimizer.from_connection(conn, db_path).optimize(skip_vacuum=True)
         
-        # The query plan should mention using an index
-        plan_text = str(plan_after)
+        # The query plan should now use the index
+        plan_after = conn.execute(query).fetchall()
+        plan_text = str([tuple(row) for row in plan_after])
         assert 'idx_logbook_first_spotted' in plan_text or 'INDEX' in plan_text
         
-        conn.close()
\ No newline at end of file
+        conn.close()
+    
+    def test_from_connection_rejects_transactional_connections(self, db_path):
+        """Test that a connection that isn't in autocommit mode is refused."""
+        conn = sqlite3.connect(db_path)
+        with pytest.raises(ValueError, match="autocommit"):
+            DatabaseOptimizer.from_connection(conn, db_path)
+        
+        conn.isolation_level = None
+        conn.execute("BEGIN")
+        with pytest.raises(ValueError, match="transaction"):
+            DatabaseOptimizer.from_connection(conn, db_path)
+        
+        conn.rollback()
+        conn.close()
@@ -2,10 +2,11 @@
 Tests for Planespotters API client.
 """
 
-from unittest.mock import patch, MagicMock
+import pytest
 import time
 
-from backend.planespotters_client import (
+from backend.core import planespotters_client
+from backend.core.planespotters_client import (
     fetch_aircraft_details,
     get_aircraft_type_string,
     get_airline_info,
@@ -16,25 +17,62 @@ from backend.planespotters_client import (
 )
 
 
-class TestPlanespottersClient:
-    """Test Planespotters API client functionality."""
+class FakeResponse:
+    """Minimal stand-in for a requests Response."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        # Clear cache before each test
-        clear_cache()
+    def __init__(self, status_code, json_data=None):
+        self.status_code = status_code
+        self._json_data = json_data
     
-    def teardown_method(self):
-        """Clean up after tests."""
-        clear_cache()
+    def json(self):
+        return self._json_data
+
+
+class FakePool:
+    """Stand-in for the API connection pool that records requested URLs."""
+    
+    def __init__(self):
+        self.response = None
+        self.error = None
+        self.urls = []
+    
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        if self.error:
+            raise self.error
+        return self.response
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """Route the client's requests to a FakePool."""
+    pool = FakePool()
+    monkeypatch.setattr(planespotters_client, 'get_global_pool', lambda: pool)
+    return pool
+
+
+@pytest.fixture
+def fake_details(monkeypatch):
+    """Serve aircraft details from a dict keyed by upper-case icao24."""
+    store = {}
+    monkeypatch.setattr(planespotters_client, 'fetch_aircraft_details',
+                        lambda icao24: store.get(icao24.upper()))
+    return store
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start every test with an empty details cache."""
+    clear_cache()
+    yield
+
+
+class TestPlanespottersClient:
+    """Test Planespotters API client functionality."""
     
-    @patch('backend.planespotters_client.get_global_pool')
-    def test_fetch_aircraft_details_success(self, mock_get_pool):
+    def test_fetch_aircraft_details_success(self, fake_pool):
         """Test successful aircraft details fetch."""
-        # Mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        fake_pool.response = FakeResponse(200, {
             'registration': 'N12345',
             'aircraft_type': 'B738',
             'aircraft_type_text': 'Boeing 737-800',
@@ -48,11 +86,7 @@ class TestPlanespottersClient:
             'built': '2010',
             'engines': 2,
             'age': 13
-        }
-        
-        mock_pool = MagicMock()
-        mock_pool.get.return_value = mock_response
-        mock_get_pool.return_value = mock_pool
+        })
         
         # Test
         result = fetch_aircraft_details('abc123')
@@ -65,20 +99,12 @@ class TestPlanespottersClient:
         assert result['airline_name'] == 'Test Airlines'
         
         # Verify API was called correctly
-        mock_pool.get.assert_called_once()
-        call_args = mock_pool.get.call_args
-        assert 'ABC123' in call_args[0][0]
+        assert len(fake_pool.urls) == 1
+        assert 'ABC123' in fake_pool.urls[0]
     
-    @patch('backend.planespotters_client.get_global_pool')
-    def test_fetch_aircraft_details_not_found(self, mock_get_pool):
+    def test_fetch_aircraft_details_not_found(self, fake_pool):
         """Test aircraft details fetch when not found."""
-        # Mock 404 response
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        
-        mock_pool = MagicMock()
-        mock_pool.get.return_value = mock_response
-        mock_get_pool.return_value = mock_pool
+        fake_pool.response = FakeResponse(404)
         
         # Test
         result = fetch_aircraft_details('xyz999')
@@ -89,20 +115,16 @@ class TestPlanespottersClient:
         assert 'XYZ999' in _aircraft_details_cache
         assert _aircraft_details_cache['XYZ999'] is None
     
-    @patch('backend.planespotters_client.get_global_pool')
-    def test_fetch_aircraft_details_error(self, mock_get_pool):
+    def test_fetch_aircraft_details_error(self, fake_pool):
         """Test aircraft details fetch with error."""
-        # Mock error
-        mock_pool = MagicMock()
-        mock_pool.get.side_effect = Exception("Network error")
-        mock_get_pool.return_value = mock_pool
+        fake_pool.error = Exception("Network error")
         
         # Test
         result = fetch_aircraft_details('error123')
         
         assert result is None
     
-    def test_fetch_aircraft_details_cache(self):
+    def test_fetch_aircraft_details_cache(self, fake_pool):
         """Test that cached results are used."""
         # Pre-populate cache
         test_data = {
@@ -113,112 +135,79 @@ class TestPlanespottersClient:
         _aircraft_details_cache['TEST123'] = test_data
         _cache_timestamps['TEST123'] = time.time()
         
-        # Mock pool should not be called
-        with patch('backend.planespotters_client.get_global_pool') as mock_get_pool:
-            result = fetch_aircraft_details('test123')
-            
-            assert result == test_data
-            mock_get_pool.assert_not_called()
+        # Pool should not be called
+        result = fetch_aircraft_details('test123')
+        
+        assert result == test_data
+        assert fake_pool.urls == []
     
-    def test_fetch_aircraft_details_cache_expired(self):
+    def test_fetch_aircraft_details_cache_expired(self, fake_pool):
         """Test that expired cache is not used."""
         # Pre-populate cache with old timestamp
         test_data = {'icao24': 'OLD123'}
         _aircraft_details_cache['OLD123'] = test_data
         _cache_timestamps['OLD123'] = time.time() - 100000  # Very old
         
-        with patch('backend.planespotters_client.get_global_pool') as mock_get_pool:
-            mock_response = MagicMock()
-            mock_response.status_code = 404
-            mock_pool = MagicMock()
-            mock_pool.get.return_value = mock_response
-            mock_get_pool.return_value = mock_pool
-            
-            result = fetch_aircraft_details('old123')
-            
-            # Should have made API call
-            mock_get_pool.assert_called_once()
+        fake_pool.response = FakeResponse(404)
+        
+        fetch_aircraft_details('old123')
+        
+        # Should have made API call
+        assert len(fake_pool.urls) == 1
     
-    def test_get_aircraft_type_string(self):
+    def test_get_aircraft_type_string(self, fake_details):
         """Test aircraft type string formatting."""
         # Test with full data
-        with patch('backend.planespotters_client.fetch_aircraft_details') as mock_fetch:
-            mock_fetch.return_value = {
-                'manufacturer': 'Airbus',
-                'model': 'A320-214'
-            }
-            
-            result = get_aircraft_type_string('test123')
-            assert result == 'Airbus A320-214'
+        fake_details['TEST123'] = {
+            'manufacturer': 'Airbus',
+            'model': 'A320-214'
+        }
+        assert get_aircraft_type_string('test123') == 'Airbus A320-214'
         
         # Test with only aircraft_type_text
-        with patch('backend.planespotters_client.fetch_aircraft_details') as mock_fetch:
-            mock_fetch.return_value = {
-                'aircraft_type_text': 'Boeing 747-400'
-            }
-            
-            result = get_aircraft_type_string('test456')
-            assert result == 'Boeing 747-400'
+        fake_details['TEST456'] = {
+            'aircraft_type_text': 'Boeing 747-400'
+        }
+        assert get_aircraft_type_string('test456') == 'Boeing 747-400'
         
         # Test with no data
-        with patch('backend.planespotters_client.fetch_aircraft_details') as mock_fetch:
-            mock_fetch.return_value = None
-            
-            result = get_aircraft_type_string('nodata')
-            assert result is None
+        assert get_aircraft_type_string('nodata') is None
     
-    def test_get_airline_info(self):
+    def test_get_airline_info(self, fake_details):
         """Test airline info extraction."""
-        with patch('backend.planespotters_client.fetch_aircraft_details') as mock_fetch:
-            mock_fetch.return_value = {
-                'airline_name': 'United Airlines',
-                'airline_iata': 'UA',
-                'airline_icao': 'UAL'
-            }
-            
-            result = get_airline_info('test123')
-            assert result == {
-                'name': 'United Airlines',
-                'iata': 'UA',
-                'icao': 'UAL'
-            }
+        fake_details['TEST123'] = {
+            'airline_name': 'United Airlines',
+            'airline_iata': 'UA',
+            'airline_icao': 'UAL'
+        }
+        assert get_airline_info('test123') == {
+            'name': 'United Airlines',
+            'iata': 'UA',
+            'icao': 'UAL'
+        }
         
         # Test with no airline data
-        with patch('backend.planespotters_client.fetch_aircraft_details') as mock_fetch:
-            mock_fetch.return_value = {
-                'manufacturer': 'Boeing'
-            }
-            
-            result = get_airline_info('test456')
-            assert result is None
+        fake_details['TEST456'] = {
+            'manufacturer': 'Boeing'
+        }
+        assert get_airline_info('test456') is None
     
-    def test_get_aircraft_type_fallback(self):
+    def test_get_aircraft_type_fallback(self, fake_details):
         """Test aircraft type fallback logic."""
+        fake_details['TEST123'] = {'manufacturer': 'Airbus', 'model': 'A320-200'}
+        fake_details['TEST456'] = {'manufacturer': 'Boeing', 'model': '777-300ER'}
+        
         # Test with good existing type
-        result = get_aircraft_type_fallback('test123', 'Boeing 737-800')
-        assert result == 'Boeing 737-800'
+        assert get_aircraft_type_fallback('test123', 'Boeing 737-800') == 'Boeing 737-800'
         
         # Test with Unknown Aircraft - should try fallback
-        with patch('backend.planespotters_client.get_aircraft_type_string') as mock_get_type:
-            mock_get_type.return_value = 'Airbus A320-200'
-            
-            result = get_aircraft_type_fallback('test123', 'Unknown Aircraft')
-            assert result == 'Airbus A320-200'
-            mock_get_type.assert_called_once_with('test123')
+        assert get_aircraft_type_fallback('test123', 'Unknown Aircraft') == 'Airbus A320-200'
         
         # Test with no current type
-        with patch('backend.planespotters_client.get_aircraft_type_string') as mock_get_type:
-            mock_get_type.return_value = 'Boeing 777-300ER'
-            
-            result = get_aircraft_type_fallback('test456', None)
-            assert result == 'Boeing 777-300ER'
+        assert get_aircraft_type_fallback('test456', None) == 'Boeing 777-300ER'
         
         # Test when fallback also fails
-        with patch('backend.planespotters_client.get_aircraft_type_string') as mock_get_type:
-            mock_get_type.return_value = None
-            
-            result = get_aircraft_type_fallback('test789', 'Unknown Aircraft')
-            assert result == 'Unknown Aircraft'
+        assert get_aircraft_type_fallback('test789', 'Unknown Aircraft') == 'Unknown Aircraft'
     
     def test_clear_cache(self):
         """Test cache clearing."""